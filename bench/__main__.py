@@ -0,0 +1,4 @@
+# python -m bench [--only embed,media] [--json out.json] [--baseline old.json]
+from bench.run import main_cli
+
+main_cli()
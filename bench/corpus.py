@@ -0,0 +1,69 @@
+import random
+from io import BytesIO
+
+# Synthetic media corpus, generated deterministically on each run instead of being
+# checked in. Images are gradients with shapes and a little noise, so encoders see
+# roughly photo/meme-like entropy rather than flat colour or pure noise.
+#
+#   name: (format, width, height, frames)
+CASES = {
+    "png_640x480": ("PNG", 640, 480, 1),
+    "png_1280x960": ("PNG", 1280, 960, 1),
+    "png_2048x1536": ("PNG", 2048, 1536, 1),
+    "jpeg_4000x3000": ("JPEG", 4000, 3000, 1),
+    "gif_320x240x12": ("GIF", 320, 240, 12),
+    "gif_480x360x40": ("GIF", 480, 360, 40),
+    "gif_480x360x120": ("GIF", 480, 360, 120),
+}
+
+# Subset served for meme selection (matches the URLs in fixtures/reddit_hot.json)
+MEME_CASES = ["png_640x480", "png_1280x960", "png_2048x1536", "gif_320x240x12", "gif_480x360x40"]
+
+
+def _background(width, height, rnd):
+    from PIL import Image
+
+    gradient = Image.linear_gradient("L").resize((width, height))
+    img = Image.merge("RGB", (gradient, gradient.rotate(90).resize((width, height)), gradient.transpose(Image.FLIP_LEFT_RIGHT)))
+    # Seeded noise; Image.effect_noise isn't reproducible between runs
+    noise = Image.frombytes("L", (width, height), rnd.randbytes(width * height))
+    return Image.blend(img, Image.merge("RGB", (noise, noise, noise)), 0.15)
+
+
+def _draw_shapes(img, shapes, shift=0):
+    from PIL import ImageDraw
+
+    draw = ImageDraw.Draw(img)
+    for x, y, r, color in shapes:
+        draw.ellipse((x - r + shift, y - r, x + r + shift, y + r), fill=color)
+    return img
+
+
+def make_media(name, seed=0):
+    from PIL import Image
+
+    fmt, width, height, frames = CASES[name]
+    rnd = random.Random(f"{name}:{seed}")
+    background = _background(width, height, rnd)
+    shapes = [
+        (rnd.randrange(width), rnd.randrange(height), rnd.randrange(width // 20 + 1, width // 5 + 2), tuple(rnd.randrange(256) for _ in range(3)))
+        for _ in range(12)
+    ]
+    out = BytesIO()
+    if fmt == "GIF":
+        # The same shapes drifting right, so consecutive frames differ like a real animation
+        first = _draw_shapes(background.copy(), shapes).quantize(colors=128)
+        images = [first] + [
+            _draw_shapes(background.copy(), shapes, i * 4).quantize(palette=first, dither=Image.Dither.NONE)
+            for i in range(1, frames)
+        ]
+        images[0].save(out, format="GIF", save_all=True, append_images=images[1:], duration=60, loop=0)
+    elif fmt == "JPEG":
+        _draw_shapes(background, shapes).save(out, format="JPEG", quality=90)
+    else:
+        _draw_shapes(background, shapes).save(out, format=fmt)
+    return out.getvalue()
+
+
+def build(names=None, seed=0):
+    return {name: make_media(name, seed) for name in names or CASES}
@@ -0,0 +1,61 @@
+import os
+import threading
+import time
+
+# Kept free of bot imports: this module is what the spawned media workers load
+
+
+def current_rss():
+    # Resident set size in bytes (Linux); None elsewhere
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class PeakRSS:
+    # Samples RSS from a background thread; Pillow allocates outside the Python
+    # allocator, so tracemalloc can't see image buffers
+    def __init__(self, interval=0.002):
+        self.interval = interval
+        self.baseline = None
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.is_set():
+            rss = current_rss()
+            if rss is not None and rss > self.peak:
+                self.peak = rss
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self.baseline = self.peak = current_rss()
+        if self.baseline is not None:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    @property
+    def delta(self):
+        return self.peak - self.baseline if self.baseline is not None else None
+
+
+def measure_process(data, settings, repeats):
+    import PIL.Image  # noqa: F401 -- import cost is not part of the measurement
+    from media import process_media
+
+    times = []
+    with PeakRSS() as rss:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            output, filename, _ = process_media(data, settings)
+            times.append(time.perf_counter() - start)
+    return times, rss.delta, len(output), filename
@@ -0,0 +1,328 @@
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+import main
+from bench import corpus
+from bench.memory import measure_process
+from cache import MediaCache
+from dedup import MemeDedupStore
+from fake_upstream import FakeUpstream
+from upstream import UpstreamClient, provider_for
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# (host, path prefix, fake server path); media paths keep their file name
+ROUTES = [
+    ("api.openweathermap.org", "/data/2.5/weather", "/owm/current"),
+    ("api.openweathermap.org", "/data/2.5/forecast", "/owm/forecast"),
+    ("api.openweathermap.org", "/data/2.5/air_pollution", "/owm/air"),
+    ("weather.visualcrossing.com", "/VisualCrossingWebServices/rest/services/timeline/", "/vc/timeline"),
+    ("api.unsplash.com", "/search/photos", "/unsplash/search"),
+]
+
+# Typical upstream response times in seconds, scaled by --latency-scale
+LATENCY = {
+    "/owm/current": 0.08,
+    "/owm/forecast": 0.12,
+    "/owm/air": 0.09,
+    "/vc/timeline": 0.25,
+    "/unsplash/search": 0.15,
+    "media": 0.05,
+    "reddit": 0.3,
+}
+
+
+def load_fixtures(now=None):
+    data = {}
+    for name in ("owm_current", "owm_forecast", "owm_air", "vc_timeline", "unsplash_search", "reddit_hot"):
+        with open(os.path.join(FIXTURES, f"{name}.json"), encoding="utf-8") as f:
+            data[name] = json.load(f)
+    # Recorded at a fixed time; shift timestamps so the forecast covers today
+    now = int(now or time.time())
+    shift = now // 10800 * 10800 - data["owm_forecast"]["list"][0]["dt"]
+    for item in data["owm_forecast"]["list"]:
+        item["dt"] += shift
+    current = data["owm_current"]
+    current["dt"] += shift
+    current["sys"]["sunrise"] += shift
+    current["sys"]["sunset"] += shift
+    for item in data["owm_air"]["list"]:
+        item["dt"] += shift
+    return data
+
+
+class ReplayUpstream(UpstreamClient):
+    # Real client (retries, breakers, concurrency limits) pointed at the fake server
+    def __init__(self, base_url, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url
+
+    def route(self, url):
+        parts = urllib.parse.urlsplit(url)
+        for host, prefix, path in ROUTES:
+            if parts.hostname == host and parts.path.startswith(prefix):
+                return self.base_url + path
+        if parts.hostname == "i.redd.it":
+            return f"{self.base_url}/media{parts.path.rsplit('.', 1)[0]}"
+        return self.base_url + "/unrouted"
+
+    def request(self, url, headers=None, provider=None):
+        return super().request(self.route(url), headers, provider or provider_for(url))
+
+
+class ReplayReddit:
+    # Stands in for praw.Reddit: serves recorded hot listings after a blocking delay
+    def __init__(self, listings, latency):
+        self.listings = listings
+        self.latency = latency
+
+    def subreddit(self, name):
+        return SimpleNamespace(hot=lambda limit=100: self._hot(name, limit))
+
+    def _hot(self, name, limit):
+        time.sleep(self.latency)
+        return [SimpleNamespace(**{"is_video": False, **post}) for post in self.listings.get(name, [])[:limit]]
+
+
+async def _discard(text):
+    pass
+
+
+def summarise(samples):
+    samples = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 2),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 2),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 2),
+        "n": len(samples),
+    }
+
+
+class Bench:
+    def __init__(self, args):
+        self.args = args
+        self.results = {}
+        self.workdir = tempfile.mkdtemp(prefix="briefing-bench-")
+        self.server = None
+        self.bot = None
+        self.cog = None
+
+    def record(self, name, metrics):
+        self.results[name] = metrics
+        print(f"{name:<28} " + "  ".join(f"{k}={v}" for k, v in metrics.items()), flush=True)
+
+    async def setup(self):
+        scale = self.args.latency_scale
+        fixtures = load_fixtures()
+        self.server = FakeUpstream()
+        base = await self.server.start()
+        for path, name in [
+            ("/owm/current", "owm_current"),
+            ("/owm/forecast", "owm_forecast"),
+            ("/owm/air", "owm_air"),
+            ("/vc/timeline", "vc_timeline"),
+            ("/unsplash/search", "unsplash_search"),
+        ]:
+            self.server.script(path, (200, fixtures[name]), latency=LATENCY[path] * scale)
+        self.media = corpus.build(seed=self.args.seed)
+        for name, data in self.media.items():
+            self.server.script(f"/media/{name}", (200, data, {"Content-Type": "application/octet-stream"}), latency=LATENCY["media"] * scale)
+
+        main.CONFIG.update(
+            OPENWEATHER_KEY="bench",
+            VISUAL_KEY="bench",
+            UNSPLASH_KEY="bench",
+            DB_PATH=os.path.join(self.workdir, "bench.db"),
+            MEDIA_CACHE_DIR=os.path.join(self.workdir, "media"),
+            METRICS_PORT=0,
+            # Measure inline selection; a background refill would skew the timings
+            PREFETCH_POOL_SIZE=0,
+        )
+        self.bot = main.DailyBriefingBot()
+        self.bot.upstream = ReplayUpstream(base, concurrency=main.CONFIG["UPSTREAM_CONCURRENCY"], **main.CONFIG["UPSTREAM"])
+        await self.bot.upstream.start()
+        # Not connected to Discord; status line updates go nowhere
+        self.bot.presence.send = _discard
+        self.cog = main.Briefing(self.bot)
+        self.cog.new_reddit = lambda: ReplayReddit(fixtures["reddit_hot"], LATENCY["reddit"] * scale)
+        # Fill the image index so the embed takes the normal (indexed) path
+        await self.cog.refresh_image_index()
+
+    async def teardown(self):
+        if self.bot:
+            await self.bot.close()
+        if self.server:
+            await self.server.stop()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def fresh_media_cache(self):
+        cache = MediaCache(os.path.join(self.workdir, f"media-{time.monotonic_ns()}"), memory_bytes=64 * 1024 * 1024)
+        self.bot.media_cache = cache
+        return cache
+
+    def bench_startup(self):
+        code = "import sys, time; t = time.perf_counter(); import main; print(time.perf_counter() - t, 'PIL' in sys.modules, 'praw' in sys.modules)"
+        env = {k: v for k, v in os.environ.items() if k not in main.REQUIRED_KEYS}
+        samples = []
+        for _ in range(self.args.repeats):
+            out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout.split()
+            samples.append(float(out[0]))
+        self.record("startup/import_main", dict(summarise(samples), pil_loaded=out[1], praw_loaded=out[2]))
+
+    async def bench_embed(self):
+        for mode in ("cold", "warm"):
+            samples = []
+            for _ in range(self.args.iterations):
+                if mode == "cold":
+                    self.cog.cache.clear()
+                start = time.perf_counter()
+                await self.cog.build_weather_embed()
+                samples.append(time.perf_counter() - start)
+            self.record(f"embed/{mode}", summarise(samples))
+        # Several users asking at once right after the cache expired
+        samples = []
+        for _ in range(self.args.iterations):
+            self.cog.cache.clear()
+            start = time.perf_counter()
+            await asyncio.gather(*(self.cog.build_weather_embed() for _ in range(10)))
+            samples.append(time.perf_counter() - start)
+        self.record("embed/burst_of_10", summarise(samples))
+
+    def bench_media_isolated(self):
+        # One freshly spawned worker per case, so peak RSS belongs to that case alone
+        settings = main.CONFIG["MEDIA_SETTINGS"]
+        context = multiprocessing.get_context("spawn")
+        for name, data in self.media.items():
+            fmt, width, height, frames = corpus.CASES[name]
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                times, peak, out_len, filename = pool.submit(measure_process, data, settings, self.args.repeats).result()
+            stats = summarise(times)
+            self.record(f"media/{name}", {
+                "in_kb": len(data) // 1024,
+                "frames": frames,
+                "p50_ms": stats["p50_ms"],
+                "mpix_s": round(width * height * frames / 1e6 / statistics.median(times), 1),
+                "peak_rss_mb": round(peak / 2 ** 20, 1) if peak is not None else "n/a",
+                "out_kb": out_len // 1024,
+                "out": filename,
+            })
+
+    async def bench_media_throughput(self):
+        # Concurrent download + process through the media pool, no cache hits
+        urls = [
+            f"https://i.redd.it/{name}.{'gif' if name.startswith('gif') else 'png'}?n={i}"
+            for i in range(self.args.iterations)
+            for name in corpus.MEME_CASES
+        ]
+        self.fresh_media_cache()
+        start = time.perf_counter()
+        files = await asyncio.gather(*(self.cog.download_and_process_media(url) for url in urls))
+        elapsed = time.perf_counter() - start
+        self.record("media/throughput", {
+            "images": len(urls),
+            "ok": sum(1 for f in files if f),
+            "images_s": round(len(urls) / elapsed, 2),
+            "workers": main.CONFIG["MEDIA_WORKERS"],
+            "executor": main.CONFIG["MEDIA_EXECUTOR"],
+        })
+
+    async def bench_meme(self):
+        def reset(listings=True, media=True):
+            if listings:
+                self.cog.cache.clear()
+            if media:
+                self.fresh_media_cache()
+            self.cog.dedup = self.bot.dedup = MemeDedupStore(":memory:")
+
+        async def pick():
+            start = time.perf_counter()
+            meme_file, _ = await self.cog.get_reddit_meme()
+            elapsed = time.perf_counter() - start
+            if meme_file:
+                meme_file.close()
+            return elapsed
+
+        cold = []
+        for _ in range(self.args.iterations):
+            reset()
+            cold.append(await pick())
+        self.record("meme/cold", summarise(cold))
+        warm = []
+        for _ in range(self.args.iterations):
+            # Listings cached, and media for anything picked before; a fresh dedup
+            # window may still pick (and process) a post not seen yet
+            reset(listings=False, media=False)
+            warm.append(await pick())
+        self.record("meme/listings_cached", summarise(warm))
+        reset(listings=False, media=False)
+        # Back-to-back picks with a growing dedup window
+        consecutive = [await pick() for _ in range(self.args.iterations * 3)]
+        self.record("meme/consecutive", summarise(consecutive))
+
+    async def run(self):
+        only = set(self.args.only.split(",")) if self.args.only else {"startup", "embed", "media", "meme"}
+        if "startup" in only:
+            self.bench_startup()
+        try:
+            await self.setup()
+            if "embed" in only:
+                await self.bench_embed()
+            if "media" in only:
+                self.bench_media_isolated()
+                await self.bench_media_throughput()
+            if "meme" in only:
+                await self.bench_meme()
+        finally:
+            await self.teardown()
+        return self.results
+
+
+def compare(results, baseline):
+    lines = []
+    for name, metrics in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        changes = []
+        for key, value in metrics.items():
+            old = before.get(key)
+            if isinstance(value, (int, float)) and isinstance(old, (int, float)) and old and key != "n":
+                changes.append(f"{key} {old} -> {value} ({(value - old) / old:+.0%})")
+        if changes:
+            lines.append(f"{name:<28} " + "  ".join(changes))
+    return lines
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks against recorded API fixtures and a synthetic media corpus")
+    parser.add_argument("--only", help="comma-separated subset of: startup,embed,media,meme")
+    parser.add_argument("--iterations", type=int, default=20, help="iterations per async benchmark")
+    parser.add_argument("--repeats", type=int, default=5, help="repeats per startup/media case")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiplier for simulated upstream latency (0 = CPU only)")
+    parser.add_argument("--seed", type=int, default=0, help="media corpus seed")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare against a previous --json file")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(Bench(args).run())
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            print("\nChanges vs baseline:")
+            print("\n".join(compare(results, json.load(f))) or "none")
@@ -0,0 +1,196 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+
+# In-process response cache: per-entry TTL, LRU eviction, and concurrent misses share one fetch
+class TTLCache:
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl):
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    async def get_or_fetch(self, key, ttl, fetch):
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._fill(key, ttl, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.coalesced += 1
+        # Shield so one cancelled caller doesn't cancel the fetch for everyone waiting on it
+        return await asyncio.shield(task)
+
+    async def _fill(self, key, ttl, fetch):
+        value = await fetch()
+        # Failures (None) are not cached so the next caller retries
+        if value is not None:
+            self.set(key, value, ttl)
+        return value
+
+    def _finish(self, key, task):
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logging.warning(f"Cache fill failed for {key}: {task.exception()}")
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / total if total else 0.0
+
+
+class ProcessedMedia(NamedTuple):
+    filename: str
+    data: bytes = None
+    path: str = None
+    phash: int = None
+
+
+# Content-addressed cache of encoded media: a small in-memory tier in front of a
+# size-capped directory, both evicted least-recently-used first
+class MediaCache:
+    def __init__(self, directory, memory_bytes=16 * 1024 * 1024, disk_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._disk = OrderedDict()
+        self._disk_size = 0
+        # Keys with a disk write in flight; a second put for the same key skips the write
+        self._writing = set()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        entries = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith(".tmp") or not os.path.isfile(path):
+                continue
+            st = os.stat(path)
+            entries.append((st.st_mtime, name, st.st_size))
+        for _, name, size in sorted(entries):
+            stem, ext = os.path.splitext(name)
+            # Files are named <key>-<phash>.<ext> so the hash survives restarts
+            key, _, phash = stem.partition("-")
+            phash = int(phash, 16) if phash else None
+            self._disk[key] = (os.path.join(directory, name), size, f"meme{ext}", phash)
+            self._disk_size += size
+        self._evict_disk()
+
+    @staticmethod
+    def make_key(url, params):
+        raw = json.dumps([url, params], sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key):
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return entry
+        entry = self._disk.get(key)
+        if entry is not None:
+            path, _, filename, phash = entry
+            try:
+                os.utime(path)
+            except OSError:
+                self._drop_disk(key)
+                self.misses += 1
+                return None
+            self._disk.move_to_end(key)
+            self.disk_hits += 1
+            return ProcessedMedia(filename, path=path, phash=phash)
+        self.misses += 1
+        return None
+
+    async def put(self, key, media):
+        size = len(media.data)
+        if size <= self.memory_bytes // 4:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_size -= len(old.data)
+            self._memory[key] = media
+            self._memory_size += size
+            while self._memory_size > self.memory_bytes:
+                _, old = self._memory.popitem(last=False)
+                self._memory_size -= len(old.data)
+        if size > self.disk_bytes or key in self._disk or key in self._writing:
+            return
+        suffix = f"-{media.phash:016x}" if media.phash is not None else ""
+        path = os.path.join(self.directory, key + suffix + os.path.splitext(media.filename)[1])
+        self._writing.add(key)
+        try:
+            await asyncio.to_thread(self._write, path, media.data)
+        except OSError as e:
+            logging.warning(f"Media cache write failed for {path}: {e}")
+            return
+        finally:
+            self._writing.discard(key)
+        self._disk[key] = (path, size, media.filename, media.phash)
+        self._disk_size += size
+        self._evict_disk()
+
+    @staticmethod
+    def _write(path, data):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _drop_disk(self, key):
+        path, size, _, _ = self._disk.pop(key)
+        self._disk_size -= size
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict_disk(self):
+        while self._disk_size > self.disk_bytes and self._disk:
+            self._drop_disk(next(iter(self._disk)))
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / total if total else 0.0
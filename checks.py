@@ -0,0 +1,267 @@
+import asyncio
+import logging
+import sys
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
+from zoneinfo import ZoneInfo
+from dedup import BANDS, MemeDedupStore
+from media import GifFrameCounter, MediaRejected, read_media, sniff_media
+from presence import PresenceUpdater
+from scheduler import CronSpec, IntervalSpec, Job, Scheduler
+
+# Offline self-checks for the logic that regresses quietly: cron evaluation, the
+# scheduler's missed-run handling, status-line coalescing, meme dedup banding and
+# the byte-level media header parsers. No network, no Discord.
+#
+#   python checks.py
+
+
+results = []
+
+
+def check(name, ok, detail=""):
+    results.append(ok)
+    print(f"{'PASS' if ok else 'FAIL'}  {name} {detail}")
+
+
+def raises(fn, *args):
+    try:
+        fn(*args)
+    except ValueError:
+        return True
+    return False
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def check_cron():
+    kolkata = ZoneInfo("Asia/Kolkata")
+    spec = CronSpec("0 7,13,18,22 * * *", kolkata)
+    check("cron parses lists", spec.hours == [7, 13, 18, 22] and spec.minutes == [0])
+    check("cron parses ranges and steps", CronSpec("*/15 9-17/4 * * 1-5", kolkata).hours == [9, 13, 17]
+          and CronSpec("*/15 * * * *", kolkata).minutes == [0, 15, 30, 45])
+    check("cron rejects bad specs", raises(CronSpec, "0 24 * * *", kolkata) and raises(CronSpec, "0 7 * *", kolkata)
+          and raises(CronSpec, "0 9-7 * * *", kolkata))
+
+    # 06:59 IST is 01:29 UTC
+    nxt = spec.next_after(utc(2025, 1, 6, 1, 29))
+    check("next slot same day", nxt == datetime(2025, 1, 6, 7, 0, tzinfo=kolkata), f"({nxt.isoformat()})")
+    nxt = spec.next_after(datetime(2025, 1, 6, 7, 0, tzinfo=kolkata))
+    check("next slot is strictly after", nxt == datetime(2025, 1, 6, 13, 0, tzinfo=kolkata), f"({nxt.isoformat()})")
+    nxt = spec.next_after(datetime(2025, 1, 6, 22, 30, tzinfo=kolkata))
+    check("next slot rolls over to tomorrow", nxt == datetime(2025, 1, 7, 7, 0, tzinfo=kolkata), f"({nxt.isoformat()})")
+
+    # 2025-01-06 is a Monday; "0 9 1 * 5" fires on the 1st or on Fridays
+    either = CronSpec("0 9 1 * 5", timezone.utc)
+    nxt = either.next_after(utc(2025, 1, 6))
+    check("restricted day fields match either", nxt == utc(2025, 1, 10, 9), f"({nxt.isoformat()})")
+    check("weekday 7 is Sunday", CronSpec("0 9 * * 7", timezone.utc).next_after(utc(2025, 1, 6)) == utc(2025, 1, 12, 9))
+
+    london = ZoneInfo("Europe/London")
+    # Clocks go forward at 01:00 GMT on 2025-03-30; 01:30 local doesn't exist that day
+    gap = CronSpec("30 1 * * *", london).next_after(utc(2025, 3, 30, 0, 0))
+    check("DST gap fires once, just after the jump", gap.astimezone(timezone.utc) == utc(2025, 3, 30, 1, 30),
+          f"({gap.astimezone(timezone.utc).isoformat()})")
+    # Clocks go back at 01:00 GMT on 2025-10-26; 01:30 local happens twice
+    spec = CronSpec("30 1 * * *", london)
+    first = spec.next_after(utc(2025, 10, 25, 23, 0))
+    second = spec.next_after(max(first, utc(2025, 10, 26, 1, 45)))
+    check("DST overlap fires once", first.astimezone(timezone.utc) == utc(2025, 10, 26, 0, 30)
+          and second.date() == first.date() + timedelta(days=1), f"({first.isoformat()} then {second.isoformat()})")
+    check("interval adds seconds", IntervalSpec(90).next_after(utc(2025, 1, 1)) == utc(2025, 1, 1, 0, 1, 30))
+
+
+async def check_scheduler():
+    scheduler = Scheduler()
+    loop_task = asyncio.create_task(scheduler.run())
+    runs = {}
+
+    def counting(name):
+        async def callback():
+            runs[name] = runs.get(name, 0) + 1
+        return callback
+
+    try:
+        now = datetime.now(timezone.utc)
+        scheduler.add(Job("soon", IntervalSpec(3600), counting("soon")), first_run=now + timedelta(seconds=0.2))
+        scheduler.add(Job("removed", IntervalSpec(3600), counting("removed")), first_run=now + timedelta(seconds=0.2))
+        scheduler.remove("removed")
+        # Re-adding a job bumps its generation; the first heap entry must not fire
+        scheduler.add(Job("replaced", IntervalSpec(3600), counting("replaced")), first_run=now + timedelta(seconds=0.1))
+        scheduler.add(Job("replaced", IntervalSpec(3600), counting("replaced")), first_run=now + timedelta(seconds=0.3))
+        missed = now - timedelta(seconds=600)
+        skip = scheduler.add(Job("skip", IntervalSpec(3600), counting("skip"), missed="skip", grace=300), first_run=missed)
+        catch_up = scheduler.add(Job("catch_up", IntervalSpec(3600), counting("catch_up"), grace=300), first_run=missed)
+        await asyncio.sleep(0.6)
+        check("due job runs once", runs.get("soon") == 1)
+        check("removed job never runs", "removed" not in runs)
+        check("replaced job runs once", runs.get("replaced") == 1)
+        check("missed slot is skipped under 'skip'", "skip" not in runs and skip.skipped == 1)
+        check("missed slot runs once under 'catch_up'", runs.get("catch_up") == 1 and catch_up.last_lateness >= 600,
+              f"({catch_up.last_lateness:.0f}s late)")
+        check("missed jobs move to the next slot", skip.next_run > now and catch_up.next_run > now)
+    finally:
+        loop_task.cancel()
+        scheduler.shutdown()
+
+
+async def check_presence():
+    sent = []
+    failing = set()
+
+    async def send(text):
+        await asyncio.sleep(0.05)
+        if text in failing:
+            raise RuntimeError("gateway closed")
+        sent.append(text)
+
+    presence = PresenceUpdater(send, min_interval=0)
+    presence.update("A")
+    await asyncio.sleep(0.01)
+    # Arrives while "A" is still being sent
+    presence.update("B")
+    await asyncio.sleep(0.2)
+    check("presence sends text that arrives mid-send", sent == ["A", "B"] and presence.pending is None, f"({sent})")
+    presence.update("B")
+    await asyncio.sleep(0.1)
+    check("presence skips unchanged text", sent == ["A", "B"] and presence.unchanged == 1)
+
+    failing.add("C")
+    presence.update("C")
+    await asyncio.sleep(0.1)
+    failing.clear()
+    presence.update("C")
+    await asyncio.sleep(0.1)
+    check("presence retries text whose send failed", sent[-1] == "C" and presence.current == "C", f"({sent})")
+    presence.invalidate()
+    await asyncio.sleep(0.1)
+    check("presence resends after invalidate", sent[-2:] == ["C", "C"])
+
+    sent.clear()
+    presence = PresenceUpdater(send, min_interval=0.3)
+    for text in ("X", "Y", "Z"):
+        presence.update(text)
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.5)
+    check("presence collapses changes inside the window", sent == ["X", "Z"] and presence.sent == 2, f"({sent})")
+    presence.stop()
+
+
+def flip(value, bits):
+    for bit in bits:
+        value ^= 1 << bit
+    return value
+
+
+def check_dedup():
+    base = 0x0123_4567_89AB_CDEF
+    store = MemeDedupStore(":memory:", max_distance=BANDS - 1)
+    store.add("a", base)
+    check("dedup matches the same hash", store.similar(base))
+    # Worst case for banding: the differing bits land in different bands
+    spread = flip(base, [0, 16, 32][:BANDS - 1])
+    check("dedup matches across bands at the limit", store.similar(spread))
+    check("dedup rejects one bit too many", not store.similar(flip(spread, [48])))
+    store.add("b", 1 << 63 | 5)
+    check("dedup handles hashes with the top bit set", store.similar(1 << 63 | 4))
+    check("dedup tracks post ids", store.seen("a") and store.unseen(["a", "c"]) == {"c"})
+    store.close()
+
+    wide = MemeDedupStore(":memory:", max_distance=6)
+    wide.add("a", base)
+    # Six bits, at least two in every band: no band matches exactly
+    check("dedup beyond the band limit still matches", wide.full_scan and wide.similar(flip(base, [0, 1, 16, 17, 32, 48])))
+    check("dedup beyond the band limit keeps the distance", not wide.similar(flip(base, [0, 1, 16, 17, 32, 33, 48])))
+    wide.close()
+
+
+def encode(fmt, size, frames=1, **params):
+    from PIL import Image
+
+    images = [Image.new("RGB", size, (i * 20 % 256, 80, 160)) for i in range(frames)]
+    out = BytesIO()
+    if frames > 1:
+        params.update(save_all=True, append_images=images[1:], duration=50)
+    images[0].save(out, format=fmt, **params)
+    return out.getvalue()
+
+
+def sniffed(data):
+    try:
+        return sniff_media(data)
+    except MediaRejected as e:
+        return e.reason
+
+
+class ChunkedBody:
+    # Just enough of an aiohttp response for read_media
+    def __init__(self, data, chunk):
+        self.data = data
+        self.chunk = chunk
+        self.content_length = None
+        self.content = self
+
+    async def iter_chunked(self, _):
+        for i in range(0, len(self.data), self.chunk):
+            yield self.data[i:i + self.chunk]
+
+
+async def read_limited(data, **limits):
+    limits = dict({"max_bytes": 1 << 30, "max_pixels": 1 << 30, "max_frames": 1000}, **limits)
+    try:
+        _, info = await read_media(ChunkedBody(data, 100), **limits)
+        return info
+    except MediaRejected as e:
+        return e.reason
+
+
+def check_media():
+    for name, fmt, params in [
+        ("PNG", "PNG", {}),
+        ("GIF", "GIF", {}),
+        ("baseline JPEG", "JPEG", {}),
+        ("progressive JPEG", "JPEG", {"progressive": True}),
+        ("lossy WEBP", "WEBP", {"lossless": False}),
+        ("lossless WEBP", "WEBP", {"lossless": True}),
+    ]:
+        info = sniffed(encode(fmt, (321, 203), **params))
+        check(f"sniff {name}", info == (fmt, 321, 203), f"({info})")
+    animated = sniffed(encode("WEBP", (64, 48), frames=3))
+    check("sniff animated WEBP", animated == ("WEBP", 64, 48), f"({animated})")
+    # A large EXIF block pushes the JPEG frame header well past the first chunk
+    jpeg = encode("JPEG", (640, 480), exif=b"Exif\x00\x00" + bytes(60000))
+    check("sniff JPEG waits for the frame header", sniffed(jpeg[:4096]) is None and sniffed(jpeg) == ("JPEG", 640, 480))
+    check("sniff wants more bytes for a short head", sniffed(b"\x89PNG\r\n\x1a\n") is None)
+    check("sniff rejects unknown formats", sniffed(b"<!DOCTYPE html><html>") == "unsupported")
+
+    gif = encode("GIF", (40, 30), frames=17)
+    counter = GifFrameCounter(gif)
+    # Feed the buffer a few bytes at a time, as the download loop does
+    for end in range(13, len(gif) + 7, 7):
+        counter.scan(gif[:end])
+    check("GIF frames counted incrementally", counter.frames == 17 and counter.complete, f"({counter.frames})")
+    # 40x30, no global colour table, then a byte that starts no known block
+    corrupt = b"GIF89a(\x00\x1e\x00\x00\x00\x00\x99"
+    check("GIF corrupt block rejected", raises(GifFrameCounter(corrupt).scan, corrupt))
+
+    check("download within limits", asyncio.run(read_limited(gif)) == ("GIF", 40, 30))
+    check("download over the byte cap", asyncio.run(read_limited(gif, max_bytes=len(gif) - 1)) == "too_large")
+    check("download over the pixel cap", asyncio.run(read_limited(gif, max_pixels=40 * 30 - 1)) == "too_many_pixels")
+    check("download over the frame cap", asyncio.run(read_limited(gif, max_frames=16)) == "too_many_frames")
+    check("empty download", asyncio.run(read_limited(b"")) == "empty")
+
+
+def main():
+    check_cron()
+    asyncio.run(check_scheduler())
+    asyncio.run(check_presence())
+    check_dedup()
+    check_media()
+    return all(results)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,106 @@
+import logging
+import sqlite3
+import time
+
+BANDS = 4
+BAND_BITS = 64 // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+def _bands(phash):
+    return [(phash >> (i * BAND_BITS)) & BAND_MASK for i in range(BANDS)]
+
+
+def _to_signed(phash):
+    # SQLite integers are signed 64-bit
+    return phash - (1 << 64) if phash >= 1 << 63 else phash
+
+
+def _to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+# Posted memes over a rolling window, keyed by Reddit post id and by perceptual
+# hash so cross-posts of the same image are caught too. Lives in SQLite, so memory
+# stays flat and history survives restarts.
+class MemeDedupStore:
+    def __init__(self, path, window_days=7, max_distance=3):
+        self.window = window_days * 86400
+        # Hashes are split into BANDS bands, each indexed; two hashes within
+        # BANDS - 1 bits of each other always share at least one band exactly.
+        # Wider distances can't use the bands and scan the whole window instead.
+        self.max_distance = max_distance
+        self.full_scan = max_distance >= BANDS
+        if self.full_scan:
+            logging.warning(
+                f"Meme dedup distance {max_distance} is over {BANDS - 1} bits; similarity checks scan every recent hash"
+            )
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS seen_memes (
+                post_id TEXT PRIMARY KEY,
+                phash INTEGER,
+                {", ".join(f"band{i} INTEGER" for i in range(BANDS))},
+                seen_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_seen_memes_seen_at ON seen_memes (seen_at);
+            {"".join(f"CREATE INDEX IF NOT EXISTS idx_seen_memes_band{i} ON seen_memes (band{i});" for i in range(BANDS))}
+            """
+        )
+        self.conn.commit()
+        self._last_prune = 0.0
+
+    def _cutoff(self):
+        return time.time() - self.window
+
+    def unseen(self, post_ids):
+        post_ids = list(post_ids)
+        if not post_ids:
+            return set()
+        placeholders = ",".join("?" * len(post_ids))
+        rows = self.conn.execute(
+            f"SELECT post_id FROM seen_memes WHERE post_id IN ({placeholders}) AND seen_at >= ?",
+            (*post_ids, self._cutoff()),
+        )
+        return set(post_ids) - {row[0] for row in rows}
+
+    def seen(self, post_id):
+        return not self.unseen([post_id])
+
+    def similar(self, phash):
+        if phash is None:
+            return False
+        if self.full_scan:
+            rows = self.conn.execute(
+                "SELECT phash FROM seen_memes WHERE phash IS NOT NULL AND seen_at >= ?", (self._cutoff(),)
+            )
+        else:
+            where = " OR ".join(f"band{i} = ?" for i in range(BANDS))
+            rows = self.conn.execute(
+                f"SELECT phash FROM seen_memes WHERE ({where}) AND seen_at >= ?",
+                (*_bands(phash), self._cutoff()),
+            )
+        return any(hamming(phash, _to_unsigned(row[0])) <= self.max_distance for row in rows)
+
+    def add(self, post_id, phash=None):
+        bands = _bands(phash) if phash is not None else [None] * BANDS
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO seen_memes VALUES (?, ?, {', '.join('?' * BANDS)}, ?)",
+            (post_id, _to_signed(phash) if phash is not None else None, *bands, time.time()),
+        )
+        self.conn.commit()
+        if time.time() - self._last_prune > 3600:
+            self.prune()
+
+    def prune(self):
+        self.conn.execute("DELETE FROM seen_memes WHERE seen_at < ?", (self._cutoff(),))
+        self.conn.commit()
+        self._last_prune = time.time()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import sys
+import time
+from aiohttp import web
+from upstream import CircuitOpenError, UpstreamClient, UpstreamError
+
+# Local stand-in for OpenWeather/Unsplash/etc. Each path plays back a script of
+# responses so retry, Retry-After and circuit breaker behaviour can be exercised
+# without touching the real APIs.
+#
+#   python fake_upstream.py          runs the self-check scenarios below
+
+
+class FakeUpstream:
+    def __init__(self):
+        self.scripts = {}
+        self.hits = {}
+        self.latency = {}
+        self.runner = None
+        self.base_url = None
+
+    def script(self, path, *responses, latency=0):
+        # Each response is (status, body) or (status, body, headers) or ("delay", seconds);
+        # the last one repeats once the script runs out. `latency` is added to every response.
+        self.scripts[path] = list(responses)
+        self.hits[path] = 0
+        self.latency[path] = latency
+
+    async def _handle(self, request):
+        path = request.path
+        self.hits[path] = self.hits.get(path, 0) + 1
+        script = self.scripts.get(path) or [(404, {"message": "not found"})]
+        step = script.pop(0) if len(script) > 1 else script[0]
+        if self.latency.get(path):
+            await asyncio.sleep(self.latency[path])
+        if step[0] == "delay":
+            await asyncio.sleep(step[1])
+            step = (200, {"ok": True})
+        status, body, *rest = step
+        headers = rest[0] if rest else {}
+        if isinstance(body, (dict, list)):
+            return web.json_response(body, status=status, headers=headers)
+        return web.Response(body=body, status=status, headers=headers)
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_route("GET", "/{tail:.*}", self._handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+        return self.base_url
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+
+
+async def _get_json(client, url):
+    async with client.request(url, provider="fake") as resp:
+        return resp.status, await resp.json()
+
+
+async def self_check():
+    server = FakeUpstream()
+    base = await server.start()
+    client = UpstreamClient(retries=2, backoff=0.05, read_timeout=0.5, failure_threshold=3, reset_timeout=0.5)
+    await client.start()
+    results = []
+
+    def check(name, ok, detail=""):
+        results.append(ok)
+        print(f"{'PASS' if ok else 'FAIL'}  {name} {detail}")
+
+    try:
+        server.script("/flaky", (503, {}), (502, {}), (200, {"temp": 30}))
+        status, body = await _get_json(client, base + "/flaky")
+        check("retries 5xx then succeeds", status == 200 and server.hits["/flaky"] == 3)
+
+        server.script("/limited", (429, {}, {"Retry-After": "1"}), (200, {"ok": True}))
+        start = time.monotonic()
+        status, _ = await _get_json(client, base + "/limited")
+        waited = time.monotonic() - start
+        check("honors Retry-After", status == 200 and waited >= 1, f"(waited {waited:.2f}s)")
+
+        server.script("/missing", (404, {"message": "nope"}))
+        status, _ = await _get_json(client, base + "/missing")
+        check("4xx is returned, not retried", status == 404 and server.hits["/missing"] == 1)
+
+        server.script("/slow", ("delay", 2))
+        try:
+            await _get_json(client, base + "/slow")
+            check("read timeout raises", False)
+        except UpstreamError:
+            check("read timeout raises", True)
+
+        client.breaker("fake").record_success()
+        server.script("/down", (500, {}))
+        try:
+            await _get_json(client, base + "/down")
+        except UpstreamError:
+            pass
+        hits_when_opened = server.hits["/down"]
+        start = time.monotonic()
+        try:
+            await _get_json(client, base + "/down")
+            check("open circuit fails fast", False)
+        except CircuitOpenError:
+            elapsed = time.monotonic() - start
+            check("open circuit fails fast", server.hits["/down"] == hits_when_opened, f"({elapsed * 1000:.1f}ms)")
+
+        server.script("/down", (200, {"ok": True}))
+        await asyncio.sleep(0.6)
+        status, _ = await _get_json(client, base + "/down")
+        check("half-open probe closes circuit", status == 200 and client.breaker("fake").state == "closed")
+
+        server.script("/down", (500, {}))
+        try:
+            await _get_json(client, base + "/down")
+        except UpstreamError:
+            pass
+        await asyncio.sleep(0.6)
+        server.script("/down", ("delay", 0.4))
+        try:
+            await asyncio.wait_for(_get_json(client, base + "/down"), 0.1)
+        except asyncio.TimeoutError:
+            pass
+        server.script("/down", (200, {"ok": True}))
+        status, _ = await _get_json(client, base + "/down")
+        check("cancelled probe doesn't wedge the circuit", status == 200 and client.breaker("fake").state == "closed")
+    finally:
+        await client.close()
+        await server.stop()
+    return all(results)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(0 if asyncio.run(self_check()) else 1)
@@ -0,0 +1,71 @@
+from array import array
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import NamedTuple
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+DAY = 86400
+
+
+class DaySummary(NamedTuple):
+    day: date
+    temp_min: float
+    temp_max: float
+    pop: float
+    wind_max: float
+    weather_id: int
+
+
+# Parsed OpenWeather 5-day/3-hour forecast. Built once per fetch: metrics live in
+# flat arrays and per-local-day aggregates are computed up front, so readers never
+# touch the raw JSON or build datetimes per entry.
+class ForecastModel:
+    def __init__(self, data, tz):
+        items = data["list"]
+        self.tz = tz
+        self.timestamps = array("q", (item["dt"] for item in items))
+        self.temps = array("d", (item["main"]["temp"] for item in items))
+        self.pops = array("d", (item.get("pop", 0) for item in items))
+        self.winds = array("d", (item.get("wind", {}).get("speed", 0) for item in items))
+        self.weather_ids = array("i", (item["weather"][0]["id"] if item.get("weather") else 800 for item in items))
+        self.day_numbers = self._local_day_numbers()
+        self.days = self._summarise()
+        self._by_date = {d.day: d for d in self.days}
+
+    def _offset(self, ts):
+        return int(datetime.fromtimestamp(ts, timezone.utc).astimezone(self.tz).utcoffset().total_seconds())
+
+    def _local_day_numbers(self):
+        if not self.timestamps:
+            return array("i")
+        first, last = self._offset(self.timestamps[0]), self._offset(self.timestamps[-1])
+        if first == last:
+            # No DST change inside the window: one shift for the whole series
+            return array("i", ((ts + first) // DAY for ts in self.timestamps))
+        return array("i", ((ts + self._offset(ts)) // DAY for ts in self.timestamps))
+
+    def _summarise(self):
+        days = []
+        start = 0
+        n = len(self.day_numbers)
+        while start < n:
+            day_number = self.day_numbers[start]
+            end = start
+            while end < n and self.day_numbers[end] == day_number:
+                end += 1
+            days.append(DaySummary(
+                date.fromordinal(EPOCH_ORDINAL + day_number),
+                min(self.temps[start:end]),
+                max(self.temps[start:end]),
+                max(self.pops[start:end]),
+                max(self.winds[start:end]),
+                Counter(self.weather_ids[start:end]).most_common(1)[0][0],
+            ))
+            start = end
+        return days
+
+    def day(self, day):
+        return self._by_date.get(day)
+
+    def today(self):
+        return self.day(datetime.now(self.tz).date())
@@ -0,0 +1,130 @@
+import random
+import sqlite3
+import time
+
+# Every image query falls into one of these, so the whole search space is
+# cities × buckets × day/night and can be filled ahead of time
+WEATHER_BUCKETS = ["thunderstorm", "rain", "snow", "fog", "clear", "clouds"]
+
+
+def weather_bucket(weather_id):
+    if 200 <= weather_id < 300:
+        return "thunderstorm"
+    if 300 <= weather_id < 600:
+        return "rain"
+    if 600 <= weather_id < 700:
+        return "snow"
+    if 700 <= weather_id < 800:
+        return "fog"
+    if weather_id == 800:
+        return "clear"
+    return "clouds"
+
+
+class ImageIndex:
+    def __init__(self, path, max_per_key=300, max_page=10):
+        self.max_per_key = max_per_key
+        self.max_page = max_page
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS image_index (
+                city TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                period TEXT NOT NULL,
+                url TEXT NOT NULL,
+                added_at REAL NOT NULL,
+                PRIMARY KEY (city, bucket, period, url)
+            );
+            CREATE TABLE IF NOT EXISTS image_queries (
+                query TEXT PRIMARY KEY,
+                next_page INTEGER NOT NULL,
+                refreshed_at REAL NOT NULL
+            );
+            """
+        )
+        self.conn.commit()
+        self._photos = {}
+        self._seen = {}
+        rows = self.conn.execute("SELECT city, bucket, period, url FROM image_index ORDER BY added_at")
+        for city, bucket, period, url in rows:
+            key = (city, bucket, period)
+            self._photos.setdefault(key, []).append(url)
+            self._seen.setdefault(key, set()).add(url)
+        self._queries = {
+            query: (next_page, refreshed_at)
+            for query, next_page, refreshed_at in self.conn.execute("SELECT * FROM image_queries")
+        }
+        # Keys the hot path asked for but found empty; refreshed first
+        self.urgent = set()
+
+    @staticmethod
+    def key(city, bucket, is_night):
+        return (city, bucket, "night" if is_night else "day")
+
+    def sample(self, key):
+        photos = self._photos.get(key)
+        if not photos:
+            self.urgent.add(key)
+            return None
+        return random.choice(photos)
+
+    def size(self, key=None):
+        if key:
+            return len(self._photos.get(key, ()))
+        return sum(len(p) for p in self._photos.values())
+
+    def add(self, key, urls):
+        photos = self._photos.setdefault(key, [])
+        seen = self._seen.setdefault(key, set())
+        now = time.time()
+        fresh = [u for u in dict.fromkeys(urls) if u not in seen]
+        if not fresh:
+            return 0
+        photos.extend(fresh)
+        seen.update(fresh)
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO image_index VALUES (?, ?, ?, ?, ?)",
+            [(*key, url, now) for url in fresh],
+        )
+        overflow = len(photos) - self.max_per_key
+        if overflow > 0:
+            dropped = photos[:overflow]
+            del photos[:overflow]
+            seen.difference_update(dropped)
+            self.conn.executemany(
+                "DELETE FROM image_index WHERE city = ? AND bucket = ? AND period = ? AND url = ?",
+                [(*key, url) for url in dropped],
+            )
+        self.conn.commit()
+        self.urgent.discard(key)
+        return len(fresh)
+
+    def record_refresh(self, query, found):
+        page, _ = self._queries.get(query, (1, 0))
+        # Walk through result pages on later refreshes; wrap around at the end
+        next_page = page + 1 if found and page < self.max_page else 1
+        self._queries[query] = (next_page, time.time())
+        self.conn.execute("INSERT OR REPLACE INTO image_queries VALUES (?, ?, ?)", (query, next_page, time.time()))
+        self.conn.commit()
+
+    def plan(self, queries, budget):
+        # queries: [(key, query)]. Urgent keys first, then empty keys, then the
+        # least recently refreshed queries, spending at most `budget` requests
+        def priority(item):
+            key, query = item
+            _, refreshed_at = self._queries.get(query, (1, 0))
+            return (key not in self.urgent, self.size(key) > 0, refreshed_at)
+
+        ordered = sorted(queries, key=priority)
+        covered = set()
+        first, rest = [], []
+        # One query per key before any key gets a second one
+        for key, query in ordered:
+            (rest if key in covered else first).append((key, query))
+            covered.add(key)
+        chosen = first + rest
+        return [(key, query, self._queries.get(query, (1, 0))[0]) for key, query in chosen[:budget]]
+
+    def close(self):
+        self.conn.close()
@@ -1,80 +1,311 @@
 import discord
 from discord.ext import commands
-import aiohttp
 import os
 import logging
-from datetime import datetime, timezone, timedelta, time, date
+from datetime import datetime, timezone, timedelta
+from collections import deque
+from typing import NamedTuple
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 import asyncio
+import functools
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from PIL import Image
 import urllib.parse
-import praw
+from cache import MediaCache, ProcessedMedia, TTLCache
+from media import MediaPool, MediaRejected, process_media, read_media
+from scheduler import CronSpec, IntervalSpec, Job, Scheduler
+from upstream import CircuitOpenError, UpstreamClient, UpstreamError, provider_for
+from dedup import MemeDedupStore, hamming
+from forecast import ForecastModel
+from image_index import WEATHER_BUCKETS, ImageIndex, weather_bucket
+from metrics import LoopLagMonitor, Metrics, MetricsServer
+from presence import PresenceUpdater
+from registry import DEFAULT_HOURS, Location, SubscriptionRegistry, format_offset, parse_timezone
 
 # --- INITIAL SETUP ---
-load_dotenv()
-logging.basicConfig(level=logging.INFO)
-
 REQUIRED_KEYS = [
     "DISCORD_BOT_TOKEN",
     "OPENWEATHER_API_KEY",
     "VISUALCROSSING_API_KEY",
     "UNSPLASH_API_KEY",
 ]
-for key in REQUIRED_KEYS:
-    if not os.getenv(key):
-        raise RuntimeError(f"Missing required environment variable: {key}")
-
-CONFIG = {
-    "DISCORD_TOKEN": os.getenv("DISCORD_BOT_TOKEN"),
-    "OPENWEATHER_KEY": os.getenv("OPENWEATHER_API_KEY"),
-    "VISUAL_KEY": os.getenv("VISUALCROSSING_API_KEY"),
-    "UNSPLASH_KEY": os.getenv("UNSPLASH_API_KEY"),
-    "AUTO_CHANNEL_ID": os.getenv("AUTO_CHANNEL_ID"),
-    "LOCATION": {"lat": 22.5726, "lon": 88.3639, "city": "Kolkata"},
-    "TIMEZONE": ZoneInfo("Asia/Kolkata"),
-    "REDDIT_CLIENT_ID": os.getenv("REDDIT_CLIENT_ID"),
-    "REDDIT_CLIENT_SECRET": os.getenv("REDDIT_CLIENT_SECRET"),
-    "REDDIT_USER_AGENT": os.getenv("REDDIT_USER_AGENT", "DailyBriefingBot/1.0"),
+
+def load_config():
+    return {
+        "DISCORD_TOKEN": os.getenv("DISCORD_BOT_TOKEN"),
+        "OPENWEATHER_KEY": os.getenv("OPENWEATHER_API_KEY"),
+        "VISUAL_KEY": os.getenv("VISUALCROSSING_API_KEY"),
+        "UNSPLASH_KEY": os.getenv("UNSPLASH_API_KEY"),
+        "AUTO_CHANNEL_ID": os.getenv("AUTO_CHANNEL_ID"),
+        # Default city for the status line, !briefing outside subscribed channels and AUTO_CHANNEL_ID
+        "LOCATION": Location("Kolkata", 22.5726, 88.3639, "Asia/Kolkata"),
+        "TIMEZONE": ZoneInfo("Asia/Kolkata"),
+        "REDDIT_CLIENT_ID": os.getenv("REDDIT_CLIENT_ID"),
+        "REDDIT_CLIENT_SECRET": os.getenv("REDDIT_CLIENT_SECRET"),
+        "REDDIT_USER_AGENT": os.getenv("REDDIT_USER_AGENT", "DailyBriefingBot/1.0"),
+        # Threads for blocking PRAW listings; each thread keeps its own praw.Reddit
+        "REDDIT_WORKERS": int(os.getenv("REDDIT_WORKERS", "3")),
+        # Per-source deadlines (seconds) for the weather embed fan-out
+        "SOURCE_TIMEOUTS": {"current": 8, "history": 6, "forecast": 6, "air": 5},
+        # Response cache lifetimes (seconds) per upstream endpoint
+        "CACHE_TTLS": {"current": 600, "forecast": 3600, "air": 3600, "history": 86400, "reddit": 300},
+        "CACHE_MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "256")),
+        # Pillow work runs off the event loop; "thread" or "process" pool
+        "MEDIA_WORKERS": int(os.getenv("MEDIA_WORKERS", "2")),
+        "MEDIA_EXECUTOR": os.getenv("MEDIA_EXECUTOR", "thread"),
+        # Ready-to-send memes kept in memory, refilled every interval and before each slot
+        "PREFETCH_POOL_SIZE": int(os.getenv("PREFETCH_POOL_SIZE", "3")),
+        "PREFETCH_INTERVAL": int(os.getenv("PREFETCH_INTERVAL", "900")),
+        # Memes are not reposted within this many days, by post id or by image hash distance (bits)
+        "MEME_DEDUP_DAYS": int(os.getenv("MEME_DEDUP_DAYS", "7")),
+        "MEME_DEDUP_DISTANCE": int(os.getenv("MEME_DEDUP_DISTANCE", "3")),
+        "MEME_ATTEMPTS_PER_SUB": 3,
+        # Overrides for media.DEFAULT_SETTINGS (transcoder budgets and output format)
+        "MEDIA_SETTINGS": {
+            "max_frames": int(os.getenv("MEDIA_MAX_FRAMES", "80")),
+            "frame_step": int(os.getenv("MEDIA_FRAME_STEP", "1")),
+            "max_bytes": int(os.getenv("MEDIA_MAX_BYTES", str(8 * 1024 * 1024))),
+            "static_format": os.getenv("MEDIA_STATIC_FORMAT", "PNG"),
+        },
+        # Downloads stream into memory and are abandoned as soon as the byte count or the
+        # sniffed header (dimensions, GIF frame count) goes over these limits
+        "MEDIA_LIMITS": {
+            "max_bytes": int(os.getenv("MEDIA_MAX_DOWNLOAD_MB", "25")) * 1024 * 1024,
+            "max_pixels": int(os.getenv("MEDIA_MAX_PIXELS", str(50_000_000))),
+            "max_frames": int(os.getenv("MEDIA_MAX_SOURCE_FRAMES", "1000")),
+        },
+        "MEDIA_CACHE_DIR": os.getenv("MEDIA_CACHE_DIR", ".media_cache"),
+        "MEDIA_CACHE_MEMORY_MB": int(os.getenv("MEDIA_CACHE_MEMORY_MB", "16")),
+        "MEDIA_CACHE_DISK_MB": int(os.getenv("MEDIA_CACHE_DISK_MB", "256")),
+        # Per-channel city/schedule subscriptions
+        "DB_PATH": os.getenv("DB_PATH", "briefing.db"),
+        # Upper bound on concurrent upstream requests across all channels and cities
+        "UPSTREAM_CONCURRENCY": int(os.getenv("UPSTREAM_CONCURRENCY", "8")),
+        # Shared HTTP client: timeouts in seconds, retries for 5xx/429, per-provider circuit breakers
+        "UPSTREAM": {
+            "limit_per_host": int(os.getenv("UPSTREAM_LIMIT_PER_HOST", "4")),
+            "connect_timeout": float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "5")),
+            "read_timeout": float(os.getenv("UPSTREAM_READ_TIMEOUT", "10")),
+            "retries": int(os.getenv("UPSTREAM_RETRIES", "2")),
+            "failure_threshold": int(os.getenv("BREAKER_FAILURES", "5")),
+            "reset_timeout": int(os.getenv("BREAKER_RESET", "60")),
+        },
+        # Scheduled posts: data is fetched PREWARM_MINUTES early; a late slot is either
+        # posted anyway ("catch_up") or dropped ("skip"); POST_JITTER spreads load in seconds
+        "PREWARM_MINUTES": int(os.getenv("PREWARM_MINUTES", "5")),
+        "MISSED_RUN_POLICY": os.getenv("MISSED_RUN_POLICY", "catch_up"),
+        "POST_JITTER": int(os.getenv("POST_JITTER", "0")),
+        # Channels sent to at once per slot; discord.py still queues each request on its
+        # route's rate-limit bucket, this just keeps a big slot from bursting into them
+        "POST_CONCURRENCY": int(os.getenv("POST_CONCURRENCY", "5")),
+        # Status line: checked every STATUS_TICK seconds, but the default city is only
+        # re-polled once its latest observation (from any current-weather fetch) is older
+        # than the interval for the conditions; presence goes out only when the text changes
+        "STATUS_TICK": int(os.getenv("STATUS_TICK", "300")),
+        "STATUS_INTERVALS": {
+            "volatile": int(os.getenv("STATUS_VOLATILE_INTERVAL", "600")),
+            "normal": int(os.getenv("STATUS_INTERVAL", "1800")),
+            "stable": int(os.getenv("STATUS_STABLE_INTERVAL", "3600")),
+        },
+        "PRESENCE_MIN_INTERVAL": int(os.getenv("PRESENCE_MIN_INTERVAL", "60")),
+        # Background images come from a local index; the refresher spends at most
+        # UNSPLASH_BUDGET searches per UNSPLASH_REFRESH_INTERVAL (demo tier allows 50/hour)
+        "UNSPLASH_BUDGET": int(os.getenv("UNSPLASH_BUDGET", "20")),
+        "UNSPLASH_REFRESH_INTERVAL": int(os.getenv("UNSPLASH_REFRESH_INTERVAL", "3600")),
+        # Prometheus text endpoint at http://METRICS_HOST:METRICS_PORT/metrics; port 0 turns it off
+        "METRICS_HOST": os.getenv("METRICS_HOST", "127.0.0.1"),
+        "METRICS_PORT": int(os.getenv("METRICS_PORT", "9108")),
+    }
+
+# Importing this module has no side effects: CONFIG starts from the current
+# environment and main() refreshes it in place once .env has been loaded
+CONFIG = load_config()
+
+# Circuit breaker states as exported gauge values
+BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+# Query params that carry credentials and must not end up in cache keys
+SECRET_PARAMS = {"appid", "key"}
+
+WEATHER_TERMS = {
+    "thunderstorm": "thunderstorm dramatic lightning",
+    "rain": "heavy rain monsoon wet streets",
+    "snow": "snow",
+    "fog": "foggy misty morning",
+    "clear": "clear blue sky sunny beautiful",
+    "clouds": "partly cloudy sky",
+}
+
+# OpenWeather condition groups by the hundreds digit of the weather id
+WEATHER_MAIN = {2: "Thunderstorm", 3: "Drizzle", 5: "Rain", 6: "Snow", 7: "Mist", 8: "Clouds"}
+
+WEATHER_EMOJI = {
+    "Clear": "☀️", "Clouds": "☁️", "Drizzle": "🌧️", "Rain": "🌧️",
+    "Thunderstorm": "⛈️", "Snow": "❄️", "Mist": "🌫️", "Fog": "🌫️"
+}
+
+WIND_DIRECTIONS = ('N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE', 'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW')
+
+AQI_LABELS = {1: "Good 🟢", 2: "Fair 🟡", 3: "Moderate 🟠", 4: "Poor 🔴", 5: "Very Poor ⚫"}
+
+MEME_REACTIONS = ("👍", "👎", "😂")
+
+# Rendered weather embeds are reused for the observation they were built from; one
+# missing a source (timeout, outage) is kept only briefly so the gap heals quickly
+PARTIAL_EMBED_TTL = 60
+
+FALLBACK_IMAGE_URL = "https://upload.wikimedia.org/wikipedia/commons/thumb/5/59/Kolkata_skyline_from_Hooghly_bridge.jpg/1280px-Kolkata_skyline_from_Hooghly_bridge.jpg"
+
+CITY_LANDMARKS = {
+    "Kolkata": [
+        "Howrah Bridge Kolkata",
+        "Victoria Memorial Kolkata",
+        "Ganges river Kolkata",
+        "Kolkata skyline",
+        "Prinsep Ghat Kolkata",
+        "yellow taxi Kolkata streets",
+        "Dakshineswar Temple Kolkata",
+        "Eden Gardens Kolkata"
+    ],
 }
 
+def media_to_file(media):
+    # Disk-cached media is streamed from its file rather than read into memory
+    if media.path:
+        return discord.File(media.path, filename=media.filename)
+    return discord.File(BytesIO(media.data), filename=media.filename)
+
+class Observation(NamedTuple):
+    data: dict
+    received_at: float
+    # Same condition and rounded temperature as the observation before it
+    stable: bool
+
+    @property
+    def age(self):
+        return asyncio.get_running_loop().time() - self.received_at
+
+    @property
+    def volatile(self):
+        return weather_is_volatile(self.data["weather"][0]["id"])
+
+def weather_is_volatile(weather_id):
+    # Thunderstorms, heavy/extreme rain, squalls and tornadoes change by the minute
+    return 200 <= weather_id < 300 or 502 <= weather_id <= 531 or weather_id in (771, 781)
+
+class MemePayload(NamedTuple):
+    media: ProcessedMedia
+    title: str
+    post_id: str
+
+    def to_file(self):
+        return media_to_file(self.media)
+
+class ChannelMissing(Exception):
+    # A subscribed channel the bot can no longer see (deleted, or the bot was removed)
+    def __init__(self, channel_id):
+        super().__init__(f"Channel {channel_id} not found")
+        self.channel_id = channel_id
+
 intents = discord.Intents.default()
 intents.message_content = True
 
 class DailyBriefingBot(commands.Bot):
     def __init__(self):
         super().__init__(command_prefix="!", intents=intents, help_command=None)
-        self.session = None
+        self.upstream = UpstreamClient(concurrency=CONFIG["UPSTREAM_CONCURRENCY"], **CONFIG["UPSTREAM"])
+        self.cache = TTLCache(maxsize=CONFIG["CACHE_MAX_ENTRIES"])
+        self.media_pool = MediaPool(workers=CONFIG["MEDIA_WORKERS"], kind=CONFIG["MEDIA_EXECUTOR"])
+        self.media_cache = MediaCache(
+            CONFIG["MEDIA_CACHE_DIR"],
+            memory_bytes=CONFIG["MEDIA_CACHE_MEMORY_MB"] * 1024 * 1024,
+            disk_bytes=CONFIG["MEDIA_CACHE_DISK_MB"] * 1024 * 1024,
+        )
+        self.registry = SubscriptionRegistry(CONFIG["DB_PATH"])
+        self.image_index = ImageIndex(CONFIG["DB_PATH"])
+        self.dedup = MemeDedupStore(CONFIG["DB_PATH"], window_days=CONFIG["MEME_DEDUP_DAYS"], max_distance=CONFIG["MEME_DEDUP_DISTANCE"])
+        self.presence = PresenceUpdater(self.set_watching, min_interval=CONFIG["PRESENCE_MIN_INTERVAL"])
+        self.metrics = Metrics()
+        self.metrics_server = MetricsServer(self.metrics, CONFIG["METRICS_HOST"], CONFIG["METRICS_PORT"]) if CONFIG["METRICS_PORT"] else None
+        self.loop_lag = LoopLagMonitor(
+            self.metrics.histogram(
+                "briefing_event_loop_lag_seconds",
+                "Event loop wake-up delay",
+                buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+            ),
+            self.metrics.gauge("briefing_event_loop_lag_last_seconds", "Most recent event loop wake-up delay"),
+        )
 
     async def setup_hook(self):
-        self.session = aiohttp.ClientSession()
+        await self.upstream.start()
+        if self.metrics_server:
+            try:
+                await self.metrics_server.start()
+            except OSError as e:
+                logging.error(f"Metrics endpoint unavailable: {e}")
+        self.loop_lag.start()
         await self.add_cog(Briefing(self))
 
+    async def set_watching(self, text):
+        await self.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name=text))
+
     async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
+        # Unloading the cog stops the scheduler and its jobs; only then close what they use
+        if self.get_cog("Briefing"):
+            await self.remove_cog("Briefing")
+        self.presence.stop()
+        self.loop_lag.stop()
+        if self.metrics_server:
+            await self.metrics_server.stop()
+        await self.upstream.close()
+        self.media_pool.shutdown()
+        self.registry.close()
+        self.image_index.close()
+        self.dedup.close()
         await super().close()
 
     async def on_ready(self):
-        await self.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name="Kolkata skies & desi vibes 🌤️😂"))
+        # Presence doesn't survive a reconnect; resend whatever the status line last said
+        if self.presence.current or self.presence.pending:
+            self.presence.invalidate()
+        else:
+            self.presence.update("Kolkata skies & desi vibes 🌤️😂")
         logging.info(f"Logged in as {self.user}")
 
 class Briefing(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.session = bot.session
-        self._historical_cache = None
-        self._historical_date = None
-        self.scheduled_hours = [7, 13, 18, 22]
+        self.upstream = bot.upstream
+        self.cache = bot.cache
+        self.registry = bot.registry
+        self.image_index = bot.image_index
+        self.last_embed_timings = {}
+        self.scheduled_hours = list(DEFAULT_HOURS)
         self.timezone = CONFIG["TIMEZONE"]
+        self.scheduler = Scheduler()
         self.scheduler_started = False
-        self.status_started = False
         self.bg_task = None
-        self.status_task = None
-        self.used_meme_ids = set()
-        self.meme_reset_date = None
+        self.refill_tasks = set()
+        self.dedup = bot.dedup
+        self.meme_pool = deque()
+        self.meme_refill_lock = asyncio.Lock()
+        self.prefetch_hits = 0
+        self.prefetch_misses = 0
+        self.presence = bot.presence
+        # Latest current-weather observation per location key, from any fetch
+        self.observations = {}
+        # Parsed forecast per location key, next to the raw response it was built from
+        self.forecast_models = {}
+        self.last_status_poll = float("-inf")
+        self._rendering = {}
+        self.rendered_hits = 0
+        self.rendered_misses = 0
+        self.send_slots = asyncio.Semaphore(CONFIG["POST_CONCURRENCY"])
+        self.reaction_tasks = set()
+        self._init_metrics(bot.metrics)
         self.fallback_statuses = [
             "Kolkata skies & desi vibes 🌤️😂",
             "Craving puchka & rosogolla 🍲🍬",
@@ -95,181 +326,382 @@ class Briefing(commands.Cog):
             "indianmemer",
             "IndiaMemes"
         ]
-        self.reddit = None
+        # A praw.Reddit isn't thread-safe (one requests.Session and rate limiter), so
+        # listings run on a small dedicated pool and each of its threads builds its own
+        # instance from new_reddit
+        self.new_reddit = None
+        self.reddit_local = threading.local()
+        self.reddit_executor = ThreadPoolExecutor(max_workers=CONFIG["REDDIT_WORKERS"], thread_name_prefix="reddit")
         if CONFIG.get("REDDIT_CLIENT_ID") and CONFIG.get("REDDIT_CLIENT_SECRET"):
             try:
-                self.reddit = praw.Reddit(
+                import praw
+                self.new_reddit = functools.partial(
+                    praw.Reddit,
                     client_id=CONFIG["REDDIT_CLIENT_ID"],
                     client_secret=CONFIG["REDDIT_CLIENT_SECRET"],
                     user_agent=CONFIG["REDDIT_USER_AGENT"],
                 )
+                # Fails fast on bad settings; no request is made until a listing is read
+                self.new_reddit()
                 logging.info("PRAW initialized successfully")
             except Exception as e:
+                self.new_reddit = None
                 logging.error(f"PRAW initialization failed: {e}")
         logging.info("Briefing cog loaded successfully")
 
-    async def fetch_json(self, url, headers=None):
-        async with self.session.get(url, headers=headers or {}, timeout=15) as resp:
-            if resp.status != 200:
-                logging.warning(f"API error {resp.status}: {url}")
-                return None
-            try:
-                return await resp.json()
-            except Exception as e:
-                logging.error(f"JSON decode error for {url}: {e}")
-                return None
+    def _init_metrics(self, metrics):
+        self.metrics = metrics
+        self.upstream_latency = metrics.histogram(
+            "briefing_upstream_request_seconds", "Upstream call latency including retries", ("upstream", "endpoint")
+        )
+        self.upstream_requests = metrics.counter(
+            "briefing_upstream_requests_total", "Upstream calls by outcome", ("upstream", "endpoint", "outcome")
+        )
+        self.media_latency = metrics.histogram("briefing_media_process_seconds", "Pillow processing time per image", ("format",))
+        self.briefing_latency = metrics.histogram(
+            "briefing_end_to_end_seconds", "Time from trigger to last message sent", ("trigger",), buckets=(0.5, 1, 2, 3, 5, 8, 13, 20, 30, 60)
+        )
+        self.posts = metrics.counter("briefing_channel_posts_total", "Scheduled channel posts by outcome", ("outcome",))
+        self.slot_completion = metrics.histogram(
+            "briefing_slot_completion_seconds", "Time from the scheduled hour until the last channel in the slot was posted",
+            buckets=(1, 2, 3, 5, 10, 20, 30, 60, 120, 300),
+        )
+        self.reactions = metrics.counter("briefing_reactions_total", "Meme reactions added by outcome", ("outcome",))
+        metrics.gauge("briefing_cache_hit_ratio", "Hit ratio per cache", ("cache",), fn=lambda: {
+            ("response",): self.cache.hit_rate,
+            ("media",): self.bot.media_cache.hit_rate,
+            ("meme_prefetch",): self.prefetch_hit_rate,
+        })
+        metrics.counter("briefing_cache_lookups_total", "Cache lookups by result", ("cache", "result"), fn=lambda: {
+            ("response", "hit"): self.cache.hits,
+            ("response", "coalesced"): self.cache.coalesced,
+            ("response", "miss"): self.cache.misses,
+            ("media", "hit"): self.bot.media_cache.hits,
+            ("media", "miss"): self.bot.media_cache.misses,
+            ("meme_prefetch", "hit"): self.prefetch_hits,
+            ("meme_prefetch", "miss"): self.prefetch_misses,
+            ("rendered_embed", "hit"): self.rendered_hits,
+            ("rendered_embed", "miss"): self.rendered_misses,
+        })
+        metrics.gauge("briefing_media_queue_depth", "Media jobs submitted but not finished", fn=lambda: self.bot.media_pool.queue_depth)
+        metrics.gauge("briefing_meme_pool_size", "Prefetched memes ready to send", fn=lambda: len(self.meme_pool))
+        metrics.gauge(
+            "briefing_circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", ("upstream",),
+            fn=lambda: {(name,): BREAKER_STATES[b.state] for name, b in self.upstream.breakers.items()},
+        )
+        metrics.counter("briefing_presence_updates_total", "Status line updates by result", ("result",), fn=lambda: {
+            ("sent",): self.presence.sent,
+            ("unchanged",): self.presence.unchanged,
+        })
+        metrics.gauge(
+            "briefing_job_lateness_seconds", "How late each scheduler job last started", ("job",),
+            fn=lambda: {(name,): lateness for name, lateness in self.scheduler.lateness().items()},
+        )
 
-    async def download_and_process_media(self, url: str):
+    def _record_upstream(self, upstream, endpoint, outcome, start):
+        self.upstream_latency.observe(asyncio.get_running_loop().time() - start, upstream=upstream, endpoint=endpoint)
+        self.upstream_requests.inc(upstream=upstream, endpoint=endpoint, outcome=outcome)
+
+    def cache_key(self, url):
+        parts = urllib.parse.urlsplit(url)
+        params = [(k, v) for k, v in urllib.parse.parse_qsl(parts.query) if k not in SECRET_PARAMS]
+        return f"{parts.netloc}{parts.path}?{urllib.parse.urlencode(sorted(params))}"
+
+    async def fetch_json(self, url, headers=None, ttl=None, endpoint="other"):
+        if not ttl:
+            return await self._fetch_json(url, headers, endpoint)
+        return await self.cache.get_or_fetch(self.cache_key(url), ttl, lambda: self._fetch_json(url, headers, endpoint))
+
+    async def _fetch_json(self, url, headers=None, endpoint="other"):
+        # Open circuits and exhausted retries come back as None so callers use their fallbacks
+        start = asyncio.get_running_loop().time()
+        outcome = "error"
         try:
-            headers = {"User-Agent": "DailyBriefingBot/1.0"}
-            async with self.session.get(url, headers=headers) as resp:
+            async with self.upstream.request(url, headers=headers) as resp:
                 if resp.status != 200:
-                    logging.warning(f"Failed to download {url} - status {resp.status}")
+                    outcome = f"http_{resp.status}"
+                    logging.warning(f"API error {resp.status}: {self.cache_key(url)}")
                     return None
-                data = await resp.read()
-                if len(data) == 0:
-                    logging.warning(f"Empty data from {url}")
+                try:
+                    data = await resp.json()
+                except Exception as e:
+                    outcome = "bad_json"
+                    logging.error(f"JSON decode error for {self.cache_key(url)}: {e}")
                     return None
-            input_buffer = BytesIO(data)
+                outcome = "ok"
+                return data
+        except CircuitOpenError as e:
+            outcome = "circuit_open"
+            logging.warning(f"Upstream unavailable: {e}")
+            return None
+        except UpstreamError as e:
+            outcome = "unavailable"
+            logging.warning(f"Upstream unavailable: {e}")
+            return None
+        finally:
+            self._record_upstream(provider_for(url), endpoint, outcome, start)
+
+    async def fetch_processed_media(self, url: str):
+        cache_key = self.bot.media_cache.make_key(url, CONFIG["MEDIA_SETTINGS"])
+        cached = self.bot.media_cache.get(cache_key)
+        if cached:
+            return cached
+        loop = asyncio.get_running_loop()
+        try:
+            headers = {"User-Agent": "DailyBriefingBot/1.0"}
+            start = loop.time()
+            outcome = "error"
             try:
-                img = Image.open(input_buffer)
+                async with self.upstream.request(url, headers=headers) as resp:
+                    if resp.status != 200:
+                        outcome = f"http_{resp.status}"
+                        logging.warning(f"Failed to download {url} - status {resp.status}")
+                        return None
+                    try:
+                        data, info = await read_media(resp, **CONFIG["MEDIA_LIMITS"])
+                    except MediaRejected as e:
+                        outcome = e.reason
+                        logging.warning(f"Skipping {url}: {e}")
+                        return None
+                    outcome = "ok"
+            finally:
+                self._record_upstream("media", "download", outcome, start)
+            logging.info(f"Processing {info.format} {info.width}x{info.height} from {url} (media pool queue depth: {self.bot.media_pool.queue_depth})")
+            start = loop.time()
+            try:
+                output, filename, phash = await self.bot.media_pool.run(process_media, data, CONFIG["MEDIA_SETTINGS"])
             except Exception as e:
-                logging.error(f"Pillow cannot open image from {url}: {e}")
+                self.media_latency.observe(loop.time() - start, format="error")
+                logging.error(f"Pillow cannot process image from {url}: {e}")
                 return None
-            is_animated = getattr(img, "is_animated", False)
-            n_frames = getattr(img, "n_frames", 1) if is_animated else 1
-            original_format = img.format
-            input_buffer.seek(0)
-            TARGET_WIDTH = 1200
-            TARGET_HEIGHT = 675
-            frames = []
-            durations = []
-            if is_animated and original_format == "GIF" and n_frames > 1:
-                for i in range(n_frames):
-                    try:
-                        img.seek(i)
-                        frame = img.convert("RGB")
-                        duration = img.info.get("duration", 100)
-                        durations.append(duration)
-                        frame.thumbnail((TARGET_WIDTH, TARGET_HEIGHT), Image.LANCZOS)
-                        new_frame = Image.new("RGB", (TARGET_WIDTH, TARGET_HEIGHT), (0, 0, 0))
-                        paste_pos = ((TARGET_WIDTH - frame.width) // 2, (TARGET_HEIGHT - frame.height) // 2)
-                        new_frame.paste(frame, paste_pos)
-                        frames.append(new_frame)
-                    except EOFError:
-                        break
-            else:
-                img = img.convert("RGB")
-                img.thumbnail((TARGET_WIDTH, TARGET_HEIGHT), Image.LANCZOS)
-                new_img = Image.new("RGB", (TARGET_WIDTH, TARGET_HEIGHT), (0, 0, 0))
-                paste_pos = ((TARGET_WIDTH - img.width) // 2, (TARGET_HEIGHT - img.height) // 2)
-                new_img.paste(img, paste_pos)
-                frames.append(new_img)
-                durations = [100]
-            output_buffer = BytesIO()
-            if len(frames) > 1:
-                frames[0].save(
-                    output_buffer,
-                    format="GIF",
-                    append_images=frames[1:],
-                    save_all=True,
-                    duration=durations,
-                    loop=0,
-                )
-                filename = "meme.gif"
-            else:
-                frames[0].save(output_buffer, format="PNG")
-                filename = "meme.png"
-            output_buffer.seek(0)
-            if output_buffer.getbuffer().nbytes == 0:
+            self.media_latency.observe(loop.time() - start, format=os.path.splitext(filename)[1].lstrip(".") or "unknown")
+            if not output:
                 logging.error("Output buffer empty after saving")
                 return None
-            return discord.File(output_buffer, filename=filename)
+            media = ProcessedMedia(filename, data=output, phash=phash)
+            await self.bot.media_cache.put(cache_key, media)
+            return media
         except Exception as e:
             logging.error(f"Error processing media {url}: {e}")
             return None
 
-    async def get_reddit_meme(self):
-        today = date.today()
-        if self.meme_reset_date != today:
-            self.used_meme_ids.clear()
-            self.meme_reset_date = today
-        if not self.reddit:
-            logging.warning("Reddit credentials missing — no memes today")
-            return None, None
-        random.shuffle(self.subreddits)
-        for sub in self.subreddits:
-            try:
-                subreddit = self.reddit.subreddit(sub)
-                candidates = []
-                for post in subreddit.hot(limit=100):
-                    if post.over_18 or post.stickied or getattr(post, "is_video", False):
+    async def download_and_process_media(self, url: str):
+        media = await self.fetch_processed_media(url)
+        return media_to_file(media) if media else None
+
+    def _thread_reddit(self):
+        reddit = getattr(self.reddit_local, "reddit", None)
+        if reddit is None:
+            reddit = self.reddit_local.reddit = self.new_reddit()
+        return reddit
+
+    def _fetch_subreddit_candidates(self, sub):
+        # Blocking PRAW listing; only ever called from a reddit_executor thread
+        candidates = []
+        for post in self._thread_reddit().subreddit(sub).hot(limit=100):
+            if post.over_18 or post.stickied or getattr(post, "is_video", False):
+                continue
+            media_url = post.url
+            if media_url.lower().endswith('.gifv'):
+                media_url = media_url[:-4] + '.gif'
+            title = post.title.strip() or "Desi Meme 😂"
+            if media_url.lower().endswith(('.jpg', '.jpeg', '.png', '.gif')):
+                candidates.append((media_url, post.score, title, post.name))
+        candidates.sort(key=lambda x: x[1], reverse=True)
+        return candidates
+
+    async def _timed_subreddit_candidates(self, sub):
+        start = asyncio.get_running_loop().time()
+        outcome = "error"
+        try:
+            loop = asyncio.get_running_loop()
+            candidates = await loop.run_in_executor(self.reddit_executor, self._fetch_subreddit_candidates, sub)
+            outcome = "ok"
+            return candidates
+        finally:
+            self._record_upstream("reddit", sub, outcome, start)
+
+    async def get_subreddit_candidates(self, sub):
+        try:
+            return await self.cache.get_or_fetch(
+                f"reddit:{sub}",
+                CONFIG["CACHE_TTLS"]["reddit"],
+                lambda: self._timed_subreddit_candidates(sub),
+            )
+        except Exception as e:
+            logging.warning(f"Error fetching from r/{sub}: {e}")
+            return None
+
+    def _is_duplicate(self, media, exclude_hashes=()):
+        if media.phash is None:
+            return False
+        if any(hamming(media.phash, h) <= self.dedup.max_distance for h in exclude_hashes if h is not None):
+            return True
+        return self.dedup.similar(media.phash)
+
+    async def pick_meme(self, exclude=(), exclude_hashes=()):
+        # All subreddits are queried at once; the first listing with a usable post wins
+        subs = random.sample(self.subreddits, len(self.subreddits))
+        tasks = [asyncio.create_task(self.get_subreddit_candidates(sub)) for sub in subs]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                candidates = [c for c in await next_done or [] if c[3] not in exclude]
+                unseen = self.dedup.unseen(c[3] for c in candidates)
+                fresh = [c for c in candidates if c[3] in unseen][:10]
+                random.shuffle(fresh)
+                for chosen_url, _, chosen_title, chosen_id in fresh[:CONFIG["MEME_ATTEMPTS_PER_SUB"]]:
+                    media = await self.fetch_processed_media(chosen_url)
+                    if not media:
                         continue
-                    if post.name in self.used_meme_ids:
+                    if self._is_duplicate(media, exclude_hashes):
+                        # Same image as a recent or queued meme (e.g. a cross-post); never pick this post again
+                        logging.info(f"Skipping {chosen_id}: near-duplicate of a recent meme")
+                        self.dedup.add(chosen_id, media.phash)
                         continue
-                    media_url = post.url
-                    if media_url.lower().endswith('.gifv'):
-                        media_url = media_url[:-4] + '.gif'
-                    title = post.title.strip() or "Desi Meme 😂"
-                    if media_url.lower().endswith(('.jpg', '.jpeg', '.png', '.gif')):
-                        candidates.append((media_url, post.score, title, post.name))
-                if candidates:
-                    candidates.sort(key=lambda x: x[1], reverse=True)
-                    top_10 = candidates[:10]
-                    if top_10:
-                        chosen_url, _, chosen_title, chosen_id = random.choice(top_10)
-                        file = await self.download_and_process_media(chosen_url)
-                        if file:
-                            self.used_meme_ids.add(chosen_id)
-                            return file, chosen_title
-            except Exception as e:
-                logging.warning(f"Error fetching from r/{sub}: {e}")
+                    return MemePayload(media, chosen_title, chosen_id)
+        finally:
+            # Listings still in flight keep filling the cache for the next call
+            for task in tasks:
+                task.cancel()
+        return None
+
+    def take_prefetched_meme(self):
+        while self.meme_pool:
+            payload = self.meme_pool.popleft()
+            # Skip anything posted through the inline path since it was prefetched,
+            # or whose disk-cached file was evicted in the meantime
+            if self.dedup.seen(payload.post_id) or self._is_duplicate(payload.media):
+                continue
+            if payload.media.path and not os.path.exists(payload.media.path):
                 continue
-        logging.info("No suitable meme found today")
-        return None, None
+            return payload
+        return None
 
-    async def get_current_weather(self):
-        url = f"https://api.openweathermap.org/data/2.5/weather?lat={CONFIG['LOCATION']['lat']}&lon={CONFIG['LOCATION']['lon']}&appid={CONFIG['OPENWEATHER_KEY']}&units=metric"
-        return await self.fetch_json(url)
+    @property
+    def prefetch_hit_rate(self):
+        total = self.prefetch_hits + self.prefetch_misses
+        return self.prefetch_hits / total if total else 0.0
 
-    async def get_forecast(self):
-        url = f"https://api.openweathermap.org/data/2.5/forecast?lat={CONFIG['LOCATION']['lat']}&lon={CONFIG['LOCATION']['lon']}&appid={CONFIG['OPENWEATHER_KEY']}&units=metric"
-        return await self.fetch_json(url)
+    async def get_meme_payload(self):
+        if not self.new_reddit:
+            logging.warning("Reddit credentials missing — no memes today")
+            return None
+        payload = self.take_prefetched_meme()
+        if payload:
+            self.prefetch_hits += 1
+        else:
+            self.prefetch_misses += 1
+            payload = await self.pick_meme()
+        logging.info(f"Meme prefetch hit rate: {self.prefetch_hit_rate:.0%} ({len(self.meme_pool)} ready)")
+        # A refill already holding the lock would make a new one a no-op
+        if not self.meme_refill_lock.locked():
+            task = asyncio.create_task(self.refill_meme_pool())
+            self.refill_tasks.add(task)
+            task.add_done_callback(self.refill_tasks.discard)
+        if not payload:
+            logging.info("No suitable meme found today")
+            return None
+        self.dedup.add(payload.post_id, payload.media.phash)
+        return payload
 
-    async def get_daily_min_max(self):
-        data = await self.get_forecast()
-        if not data or 'list' not in data:
+    async def get_reddit_meme(self):
+        payload = await self.get_meme_payload()
+        if not payload:
             return None, None
-        today = datetime.now(self.timezone).date()
-        temps = []
-        for item in data['list']:
-            dt = datetime.fromtimestamp(item['dt'], timezone.utc).astimezone(self.timezone)
-            if dt.date() == today:
-                temps.append(item['main']['temp'])
-        if temps:
-            return round(min(temps)), round(max(temps))
-        return None, None
-
-    async def get_air_quality(self):
-        url = f"https://api.openweathermap.org/data/2.5/air_pollution?lat={CONFIG['LOCATION']['lat']}&lon={CONFIG['LOCATION']['lon']}&appid={CONFIG['OPENWEATHER_KEY']}"
-        data = await self.fetch_json(url)
+        return payload.to_file(), payload.title
+
+    async def refill_meme_pool(self):
+        if not self.new_reddit or self.meme_refill_lock.locked():
+            return
+        async with self.meme_refill_lock:
+            while len(self.meme_pool) < CONFIG["PREFETCH_POOL_SIZE"]:
+                pooled = {p.post_id for p in self.meme_pool}
+                pooled_hashes = [p.media.phash for p in self.meme_pool]
+                payload = await self.pick_meme(exclude=pooled, exclude_hashes=pooled_hashes)
+                if not payload:
+                    break
+                self.meme_pool.append(payload)
+            logging.info(f"Meme pool refilled: {len(self.meme_pool)} ready")
+
+    async def get_current_weather(self, location=None):
+        location = location or CONFIG["LOCATION"]
+        url = f"https://api.openweathermap.org/data/2.5/weather?lat={location.lat}&lon={location.lon}&appid={CONFIG['OPENWEATHER_KEY']}&units=metric"
+        data = await self.fetch_json(url, ttl=CONFIG["CACHE_TTLS"]["current"], endpoint="current")
+        if data and "main" in data and data.get("weather"):
+            self.observe(location, data)
+        return data
+
+    def observe(self, location, data):
+        previous = self.observations.get(location.key)
+        if previous and previous.data.get("dt") == data.get("dt"):
+            # Cache hit or an unchanged upstream reading
+            return
+        stable = bool(previous) and (
+            previous.data["weather"][0]["id"] == data["weather"][0]["id"]
+            and round(previous.data["main"]["temp"]) == round(data["main"]["temp"])
+        )
+        self.observations[location.key] = Observation(data, asyncio.get_running_loop().time(), stable)
+        if location.key == CONFIG["LOCATION"].key:
+            self.update_status()
+
+    def forecast_url(self, location):
+        return f"https://api.openweathermap.org/data/2.5/forecast?lat={location.lat}&lon={location.lon}&appid={CONFIG['OPENWEATHER_KEY']}&units=metric"
+
+    async def get_forecast(self, location=None):
+        location = location or CONFIG["LOCATION"]
+        return await self.fetch_json(self.forecast_url(location), ttl=CONFIG["CACHE_TTLS"]["forecast"], endpoint="forecast")
+
+    async def get_forecast_model(self, location=None):
+        # The model lives exactly as long as the cached response: it is rebuilt only
+        # when get_forecast hands back a different (refetched) response
+        location = location or CONFIG["LOCATION"]
+        data = await self.get_forecast(location)
+        if not data or 'list' not in data:
+            return None
+        entry = self.forecast_models.get(location.key)
+        if entry and entry[0] is data:
+            return entry[1]
+        model = ForecastModel(data, location.tz)
+        self.forecast_models[location.key] = (data, model)
+        return model
+
+    def cached_forecast_model(self, location):
+        # Never fetches; None once the response behind the model has expired
+        entry = self.forecast_models.get(location.key)
+        if entry and self.cache.get(self.cache_key(self.forecast_url(location))) is entry[0]:
+            return entry[1]
+        return None
+
+    async def get_air_quality(self, location=None):
+        location = location or CONFIG["LOCATION"]
+        url = f"https://api.openweathermap.org/data/2.5/air_pollution?lat={location.lat}&lon={location.lon}&appid={CONFIG['OPENWEATHER_KEY']}"
+        data = await self.fetch_json(url, ttl=CONFIG["CACHE_TTLS"]["air"], endpoint="air")
         if data and 'list' in data and data['list']:
             aqi = data['list'][0]['main']['aqi']
-            aqi_desc = {1: "Good 🟢", 2: "Fair 🟡", 3: "Moderate 🟠", 4: "Poor 🔴", 5: "Very Poor ⚫"}.get(aqi, "Unknown")
-            return aqi_desc
-        return "N/A"
-
-    async def get_historical_weather(self):
-        today = datetime.now(self.timezone).date()
-        if self._historical_date == today and self._historical_cache:
-            return self._historical_cache
-        last_year_date = (datetime.now(self.timezone) - timedelta(days=365)).strftime("%Y-%m-%d")
-        url = f"https://weather.visualcrossing.com/VisualCrossingWebServices/rest/services/timeline/{CONFIG['LOCATION']['city']}/{last_year_date}/{last_year_date}?unitGroup=metric&key={CONFIG['VISUAL_KEY']}&contentType=json"
-        data = await self.fetch_json(url)
-        result = data["days"][0] if data and data.get("days") else None
-        self._historical_cache = result
-        self._historical_date = today
-        return result
+            return AQI_LABELS.get(aqi, "Unknown")
+        return None
+
+    async def get_historical_weather(self, location=None):
+        location = location or CONFIG["LOCATION"]
+        last_year_date = (datetime.now(location.tz) - timedelta(days=365)).strftime("%Y-%m-%d")
+        url = f"https://weather.visualcrossing.com/VisualCrossingWebServices/rest/services/timeline/{location.lat},{location.lon}/{last_year_date}/{last_year_date}?unitGroup=metric&key={CONFIG['VISUAL_KEY']}&contentType=json"
+        data = await self.fetch_json(url, ttl=CONFIG["CACHE_TTLS"]["history"], endpoint="history")
+        return data["days"][0] if data and data.get("days") else None
+
+    async def lookup_timezone(self, lat, lon):
+        # Visual Crossing resolves coordinates to an IANA zone, which follows DST;
+        # OpenWeather only reports the current UTC offset
+        url = f"https://weather.visualcrossing.com/VisualCrossingWebServices/rest/services/timeline/{lat},{lon}/today?unitGroup=metric&include=days&key={CONFIG['VISUAL_KEY']}&contentType=json"
+        data = await self.fetch_json(url, ttl=CONFIG["CACHE_TTLS"]["history"], endpoint="timezone")
+        tz_name = data.get("timezone") if data else None
+        if not tz_name:
+            return None
+        try:
+            ZoneInfo(tz_name)
+        except Exception:
+            logging.warning(f"Visual Crossing returned unknown timezone {tz_name!r} for {lat},{lon}")
+            return None
+        return tz_name
 
     def get_season(self):
         month = datetime.now(CONFIG["TIMEZONE"]).month
@@ -278,87 +710,186 @@ class Briefing(commands.Cog):
         if month in (10, 11): return "autumn"
         return "winter"
 
-    def map_weather_to_image_query(self, weather_id: int, is_night: bool):
-        landmarks = random.choice([
-            "Howrah Bridge Kolkata",
-            "Victoria Memorial Kolkata",
-            "Ganges river Kolkata",
-            "Kolkata skyline",
-            "Prinsep Ghat Kolkata",
-            "yellow taxi Kolkata streets",
-            "Dakshineswar Temple Kolkata",
-            "Eden Gardens Kolkata"
-        ])
+    def image_queries(self, city, bucket, is_night):
         time_part = "night illuminated" if is_night else "daytime"
-        weather_term = ""
-        if 200 <= weather_id < 300:
-            weather_term = "thunderstorm dramatic lightning"
-        elif 300 <= weather_id < 600:
-            weather_term = "heavy rain monsoon wet streets"
-        elif 600 <= weather_id < 700:
-            weather_term = "snow"
-        elif 700 <= weather_id < 800:
-            weather_term = "foggy misty morning"
-        elif weather_id == 800:
-            weather_term = "clear blue sky sunny beautiful"
-        elif 801 <= weather_id <= 804:
-            weather_term = "partly cloudy sky"
-        return f"Kolkata {landmarks} {weather_term} {time_part} cityscape landscape photography India horizontal"
-
-    async def get_unsplash_image(self, query):
+        weather_term = WEATHER_TERMS[bucket]
+        if city not in CITY_LANDMARKS:
+            landmarks = [f"{city} skyline", f"{city} streets", f"{city} landmarks"]
+            return [f"{landmark} {weather_term} {time_part} cityscape landscape photography horizontal" for landmark in landmarks]
+        return [
+            f"{city} {landmark} {weather_term} {time_part} cityscape landscape photography India horizontal"
+            for landmark in CITY_LANDMARKS[city]
+        ]
+
+    async def search_unsplash(self, query, page):
         encoded_query = urllib.parse.quote(query)
-        page = random.randint(1, 10)
         headers = {"Authorization": f"Client-ID {CONFIG['UNSPLASH_KEY']}"}
         url = f"https://api.unsplash.com/search/photos?query={encoded_query}&per_page=30&orientation=landscape&page={page}"
-        data = await self.fetch_json(url, headers=headers)
-        if not data or "results" not in data or not data["results"]:
-            page = 1
-            url = f"https://api.unsplash.com/search/photos?query={encoded_query}&per_page=30&orientation=landscape&page=1"
-            data = await self.fetch_json(url, headers=headers)
-        ultimate_fallback = "https://upload.wikimedia.org/wikipedia/commons/thumb/5/59/Kolkata_skyline_from_Hooghly_bridge.jpg/1280px-Kolkata_skyline_from_Hooghly_bridge.jpg"
-        if data and "results" in data and data["results"]:
-            candidates = [photo["urls"]["regular"] for photo in data["results"]]
-            return random.choice(candidates)
-        logging.warning(f"Unsplash failed - using fallback")
-        return ultimate_fallback
-
-    async def get_image(self, query):
-        return await self.get_unsplash_image(query)
+        data = await self.fetch_json(url, headers=headers, endpoint="search")
+        if data is None or "results" not in data:
+            return None
+        return [photo["urls"]["regular"] for photo in data["results"]]
+
+    async def refresh_image_index(self):
+        locations = {CONFIG["LOCATION"].city: CONFIG["LOCATION"]}
+        locations.update((sub.location.city, sub.location) for sub in self.registry.all())
+        queries = [
+            (self.image_index.key(city, bucket, is_night), query)
+            for city in locations
+            for bucket in WEATHER_BUCKETS
+            for is_night in (False, True)
+            for query in self.image_queries(city, bucket, is_night)
+        ]
+        added = 0
+        plan = self.image_index.plan(queries, CONFIG["UNSPLASH_BUDGET"])
+        for key, query, page in plan:
+            urls = await self.search_unsplash(query, page)
+            if urls is None:
+                # Rate limited or circuit open; try again next interval
+                break
+            added += self.image_index.add(key, urls)
+            self.image_index.record_refresh(query, bool(urls))
+        logging.info(f"Unsplash index: +{added} photos from {len(plan)} searches ({self.image_index.size()} total)")
+
+    def get_image(self, location, weather_id, is_night):
+        # Local lookup only; empty keys are queued for the next background refresh
+        bucket = weather_bucket(weather_id)
+        url = self.image_index.sample(self.image_index.key(location.city, bucket, is_night))
+        if not url:
+            url = self.image_index.sample(self.image_index.key(location.city, bucket, not is_night))
+        if not url:
+            logging.info(f"No indexed image for {location.city}/{bucket} yet - using fallback")
+        return url or FALLBACK_IMAGE_URL
 
     def get_weather_emoji(self, weather_main):
-        return {
-            "Clear": "☀️", "Clouds": "☁️", "Drizzle": "🌧️", "Rain": "🌧️",
-            "Thunderstorm": "⛈️", "Snow": "❄️", "Mist": "🌫️", "Fog": "🌫️"
-        }.get(weather_main, "🌤️")
+        return WEATHER_EMOJI.get(weather_main, "🌤️")
 
     def get_wind_direction(self, deg):
-        directions = ['N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE', 'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW']
-        idx = int((deg + 11.25) / 22.5) % 16
-        return directions[idx]
-
-    async def cycle_status(self):
-        await self.bot.wait_until_ready()
-        while not self.bot.is_closed():
-            curr = await self.get_current_weather()
-            if curr and "main" in curr and "weather" in curr:
-                temp = round(curr["main"]["temp"])
-                feels = round(curr["main"]["feels_like"])
-                weather = curr["weather"][0]
-                emoji = self.get_weather_emoji(weather["main"])
-                desc = weather["description"]
-                # Removed the em dash after the emoji
-                status_name = f"Kolkata: {temp}°C (feels {feels}°C) {emoji} {desc.capitalize()}"
-            else:
-                status_name = random.choice(self.fallback_statuses)
-            await self.bot.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name=status_name))
-            await asyncio.sleep(1800)
+        return WIND_DIRECTIONS[int((deg + 11.25) / 22.5) % 16]
+
+    def status_interval(self, observation):
+        intervals = CONFIG["STATUS_INTERVALS"]
+        if observation.volatile:
+            return intervals["volatile"]
+        return intervals["stable"] if observation.stable else intervals["normal"]
 
-    async def build_weather_embed(self):
-        curr = await self.get_current_weather()
-        past = await self.get_historical_weather()
+    def status_text(self, observation):
+        location = CONFIG["LOCATION"]
+        curr = observation.data
+        temp = round(curr["main"]["temp"])
+        feels = round(curr["main"]["feels_like"])
+        weather = curr["weather"][0]
+        emoji = self.get_weather_emoji(weather["main"])
+        desc = weather["description"]
+        # Removed the em dash after the emoji
+        status_name = f"{location.city}: {temp}°C (feels {feels}°C) {emoji} {desc.capitalize()}"
+        # Only an already-built forecast is used; rendering never triggers a fetch
+        model = self.cached_forecast_model(location)
+        today = model.today() if model else None
+        if today and today.pop >= 0.5:
+            status_name += f" ☔ {round(today.pop * 100)}%"
+        return status_name
+
+    def update_status(self):
+        observation = self.observations.get(CONFIG["LOCATION"].key)
+        # A reading older than two refresh intervals means the refreshes are failing
+        # (outage, open breaker); don't present it as live
+        if observation and observation.age <= 2 * self.status_interval(observation):
+            self.presence.update(self.status_text(observation))
+        elif (self.presence.pending or self.presence.current) not in self.fallback_statuses:
+            self.presence.update(random.choice(self.fallback_statuses))
+
+    async def refresh_status(self):
+        # Runs every STATUS_TICK; briefings and prewarms keep the observation fresh
+        # too, so most ticks make no upstream call at all
+        loop = asyncio.get_running_loop()
+        observation = self.observations.get(CONFIG["LOCATION"].key)
+        # A poll can return the same reading (upstream updates every ~10 minutes), so
+        # staleness counts from the later of the reading and our last poll
+        if observation is None or min(observation.age, loop.time() - self.last_status_poll) >= self.status_interval(observation):
+            self.last_status_poll = loop.time()
+            await asyncio.gather(self.get_current_weather(), self.get_forecast_model(), return_exceptions=True)
+        self.update_status()
+
+    async def _timed_source(self, name, coro, timings, failed):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            return await asyncio.wait_for(coro, CONFIG["SOURCE_TIMEOUTS"].get(name, 10))
+        except asyncio.TimeoutError:
+            logging.warning(f"Embed source '{name}' timed out")
+            failed.add(name)
+            return None
+        except Exception as e:
+            logging.warning(f"Embed source '{name}' failed: {e}")
+            failed.add(name)
+            return None
+        finally:
+            timings[name] = loop.time() - start
+
+    def _log_embed_timings(self, timings):
+        branches = {
+            "current": timings.get("current", 0),
+            "history": timings.get("history", 0),
+            "forecast": timings.get("forecast", 0),
+            "air": timings.get("air", 0),
+        }
+        critical = max(branches, key=branches.get)
+        breakdown = " ".join(f"{k}={v:.2f}s" for k, v in timings.items())
+        logging.info(f"Weather embed built: {breakdown} (critical path: {critical})")
+        self.last_embed_timings = dict(timings, critical_path=critical)
+
+    def _rendered_key(self, location, observed_at):
+        return f"embed:{location.key}:{observed_at}"
+
+    async def build_weather_embed(self, location=None):
+        # Burst path: the embed for the latest observation is already rendered
+        location = location or CONFIG["LOCATION"]
+        observation = self.observations.get(location.key)
+        if observation:
+            payload = self.cache.get(self._rendered_key(location, observation.data.get("dt")))
+            if payload is not None:
+                self.rendered_hits += 1
+                return discord.Embed.from_dict(payload)
+        self.rendered_misses += 1
+        # Concurrent misses for one location share a single render
+        task = self._rendering.get(location.key)
+        if task is None:
+            task = asyncio.ensure_future(self._render_and_store(location))
+            self._rendering[location.key] = task
+            task.add_done_callback(lambda _: self._rendering.pop(location.key, None))
+        return discord.Embed.from_dict(await asyncio.shield(task))
+
+    async def _render_and_store(self, location):
+        embed, curr, complete = await self._render_weather_embed(location)
+        payload = embed.to_dict()
+        if curr:
+            ttl = CONFIG["CACHE_TTLS"]["current"] if complete else PARTIAL_EMBED_TTL
+            self.cache.set(self._rendered_key(location, curr.get("dt")), payload, ttl)
+        return payload
+
+    async def _render_weather_embed(self, location):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        timings = {}
+        # Sources that timed out or raised; an empty result (no forecast slot left
+        # today, no row for last year) is complete data, not a failure
+        failed = set()
+        curr_task = asyncio.create_task(self._timed_source("current", self.get_current_weather(location), timings, failed))
+        past_task = asyncio.create_task(self._timed_source("history", self.get_historical_weather(location), timings, failed))
+        model_task = asyncio.create_task(self._timed_source("forecast", self.get_forecast_model(location), timings, failed))
+        aqi_task = asyncio.create_task(self._timed_source("air", self.get_air_quality(location), timings, failed))
+        curr = await curr_task
         if not curr:
-            return discord.Embed(title="Weather in Kolkata", description="Unable to fetch data.", color=0xE74C3C)
+            for task in (past_task, model_task, aqi_task):
+                task.cancel()
+            return discord.Embed(title=f"Weather in {location.city}", description="Unable to fetch data.", color=0xE74C3C), None, False
+        past, model, aqi = await asyncio.gather(past_task, model_task, aqi_task)
+        today = model.today() if model else None
+        timings["total"] = loop.time() - start
+        self._log_embed_timings(timings)
         weather = curr["weather"][0]
+        image_url = self.get_image(location, weather["id"], weather["icon"].endswith("n"))
         main = weather["main"]
         temp = round(curr["main"]["temp"])
         feels = round(curr["main"]["feels_like"])
@@ -367,22 +898,20 @@ class Briefing(commands.Cog):
         wind_deg = curr["wind"].get("deg", 0)
         wind_dir = self.get_wind_direction(wind_deg)
         vis = round(curr.get("visibility", 0) / 1000, 1)
-        sunrise_dt = datetime.fromtimestamp(curr["sys"]["sunrise"], timezone.utc).astimezone(self.timezone)
-        sunset_dt = datetime.fromtimestamp(curr["sys"]["sunset"], timezone.utc).astimezone(self.timezone)
+        tz = location.tz
+        sunrise_dt = datetime.fromtimestamp(curr["sys"]["sunrise"], timezone.utc).astimezone(tz)
+        sunset_dt = datetime.fromtimestamp(curr["sys"]["sunset"], timezone.utc).astimezone(tz)
         sunrise = sunrise_dt.strftime("%I:%M %p")
         sunset = sunset_dt.strftime("%I:%M %p")
-        is_night = weather["icon"].endswith("n")
-        image_query = self.map_weather_to_image_query(weather["id"], is_night)
         color = 0x3498DB if temp < 20 else 0xF39C12 if temp < 30 else 0xE74C3C
         emoji = self.get_weather_emoji(main)
-        temp_min, temp_max = await self.get_daily_min_max()
-        if temp_min is None:
+        if today:
+            temp_min, temp_max = round(today.temp_min), round(today.temp_max)
+        else:
             temp_min = round(curr["main"]["temp_min"])
             temp_max = round(curr["main"]["temp_max"])
-        aqi = await self.get_air_quality()
-        image_url = await self.get_image(image_query)
         embed = discord.Embed(
-            title=f"{emoji} Weather in Kolkata • {weather['description'].capitalize()}",
+            title=f"{emoji} Weather in {location.city} • {weather['description'].capitalize()}",
             color=color,
             timestamp=datetime.now(timezone.utc)
         )
@@ -392,7 +921,10 @@ class Briefing(commands.Cog):
         embed.add_field(name="💧 Humidity", value=f"{humid}%", inline=True)
         embed.add_field(name="🌬️ Wind", value=f"{wind_speed} km/h {wind_dir}", inline=True)
         embed.add_field(name="👀 Visibility", value=f"{vis} km", inline=True)
-        embed.add_field(name="🌫️ Air Quality", value=aqi, inline=True)
+        if aqi:
+            embed.add_field(name="🌫️ Air Quality", value=aqi, inline=True)
+        if today:
+            embed.add_field(name="☔ Rain Chance", value=f"{round(today.pop * 100)}%", inline=True)
         embed.add_field(name="🌅 Sunrise / Sunset", value=f"{sunrise} / {sunset}", inline=False)
         if past:
             p_temp = round(past.get("temp", temp))
@@ -402,9 +934,12 @@ class Briefing(commands.Cog):
         embed.set_thumbnail(url=f"https://openweathermap.org/img/wn/{weather['icon']}@4x.png")
         embed.set_image(url=image_url)
         embed.set_footer(text="OpenWeather • Visual Crossing • Reddit")
-        return embed
+        # The forecast and air helpers return None only when their fetch failed
+        return embed, curr, not failed and model is not None and aqi is not None
 
-    async def auto_post_loop(self):
+    def seed_auto_channel(self):
+        # AUTO_CHANNEL_ID keeps working as the first subscription on fresh installs.
+        # Seeded once per channel id, so a later !unsubscribe there sticks across restarts.
         channel_id = CONFIG.get("AUTO_CHANNEL_ID")
         if not channel_id:
             return
@@ -412,62 +947,203 @@ class Briefing(commands.Cog):
             channel_id = int(channel_id)
         except ValueError:
             return
+        if self.registry.get_meta("auto_channel_seeded") == str(channel_id):
+            return
+        self.registry.set_meta("auto_channel_seeded", channel_id)
+        if self.registry.get(channel_id):
+            return
         channel = self.bot.get_channel(channel_id)
+        guild_id = channel.guild.id if channel and getattr(channel, "guild", None) else None
+        self.registry.subscribe(channel_id, guild_id, CONFIG["LOCATION"], self.scheduled_hours)
+        logging.info(f"Subscribed AUTO_CHANNEL_ID {channel_id} to {CONFIG['LOCATION'].city}")
+
+    async def _post_to_channel(self, sub, payload, embed):
+        channel = self.bot.get_channel(sub.channel_id)
         if not channel:
-            return
-        await self.bot.wait_until_ready()
-        logging.info("Auto-post scheduler started")
-        while not self.bot.is_closed():
-            now = datetime.now(self.timezone)
-            today = now.date()
-            next_time = None
-            for h in self.scheduled_hours:
-                candidate = datetime.combine(today, time(h, 0), tzinfo=self.timezone)
-                if candidate > now:
-                    next_time = candidate
-                    break
-            if not next_time:
-                next_day = today + timedelta(days=1)
-                next_time = datetime.combine(next_day, time(self.scheduled_hours[0], 0), tzinfo=self.timezone)
-            sleep_secs = (next_time - now).total_seconds()
-            await asyncio.sleep(sleep_secs)
-            try:
-                async with channel.typing():
-                    meme_file, meme_title = await self.get_reddit_meme()
-                    weather_embed = await self.build_weather_embed()
-                    if meme_file:
-                        meme_file.fp.seek(0)
-                        # Plain image with bold title (no embed border)
-                        meme_message = await channel.send(content=f"**{meme_title}**", file=meme_file)
-                        await meme_message.add_reaction('👍')
-                        await meme_message.add_reaction('👎')
-                        await meme_message.add_reaction('😂')
-                    else:
-                        await channel.send("No fresh desi meme today 😢")
-                    await channel.send(embed=weather_embed)
-            except Exception as e:
-                logging.error(f"Auto-post error: {e}")
+            raise ChannelMissing(sub.channel_id)
+        # Everything is built before the fan-out, so no typing indicator: it would only
+        # add one more request per channel ahead of the messages themselves
+        meme_message = None
+        async with self.send_slots:
+            if payload:
+                # Plain image with bold title (no embed border)
+                meme_message = await channel.send(content=f"**{payload.title}**", file=payload.to_file())
+            else:
+                await channel.send("No fresh desi meme today 😢")
+            await channel.send(embed=embed)
+        return meme_message
+
+    async def post_slot(self, subs, slot=None):
+        with self.briefing_latency.time(trigger="scheduled"):
+            await self._post_slot(subs, slot)
+
+    async def _post_slot(self, subs, slot=None):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        # One meme per slot and one embed per distinct location, fanned out to every channel
+        locations = {sub.location.key: sub.location for sub in subs}
+        payload, *embeds = await asyncio.gather(
+            self.get_meme_payload(),
+            *(self.build_weather_embed(loc) for loc in locations.values()),
+        )
+        built = loop.time() - start
+        embed_by_location = dict(zip(locations, embeds))
+        results = await asyncio.gather(
+            *(self._post_to_channel(sub, payload, embed_by_location[sub.location.key]) for sub in subs),
+            return_exceptions=True,
+        )
+        meme_messages = []
+        for sub, result in zip(subs, results):
+            if isinstance(result, ChannelMissing):
+                self.posts.inc(outcome="missing")
+                logging.warning(f"Auto-post channel {sub.channel_id} not found")
+            elif isinstance(result, Exception):
+                self.posts.inc(outcome="error")
+                logging.error(f"Auto-post error in channel {sub.channel_id}: {result}")
+            else:
+                self.posts.inc(outcome="ok")
+                if result:
+                    meme_messages.append(result)
+        since_slot = ""
+        if slot:
+            completion = (datetime.now(timezone.utc) - slot).total_seconds()
+            self.slot_completion.observe(completion)
+            since_slot = f", done {completion:.1f}s after {slot.isoformat()}"
+        logging.info(
+            f"Slot posted to {len(subs)} channels in {loop.time() - start:.1f}s "
+            f"(content ready in {built:.1f}s{since_slot})"
+        )
+        if meme_messages:
+            self._spawn_reactions(meme_messages)
+
+    def _spawn_reactions(self, messages):
+        # Reactions are decoration, so they go out after the whole slot has posted
+        task = asyncio.create_task(self._add_reactions(messages))
+        self.reaction_tasks.add(task)
+        task.add_done_callback(self.reaction_tasks.discard)
+
+    async def _add_reactions(self, messages):
+        await asyncio.gather(*(self._react(message) for message in messages))
+
+    async def _react(self, message):
+        # A message's reactions share one rate-limit bucket, so they go in order;
+        # different channels react in parallel under the same send limit
+        async with self.send_slots:
+            for emoji in MEME_REACTIONS:
+                try:
+                    await message.add_reaction(emoji)
+                except Exception as e:
+                    self.reactions.inc(outcome="error")
+                    logging.warning(f"Reaction failed in channel {message.channel.id}: {e}")
+                    return
+                self.reactions.inc(outcome="ok")
+
+    def _group_subscriptions(self, tz_name, hours):
+        return [s for s in self.registry.all() if s.location.timezone == tz_name and s.hours == hours]
+
+    async def run_post_group(self, tz_name, hours):
+        subs = self._group_subscriptions(tz_name, hours)
+        if subs:
+            job = self.scheduler.jobs.get(self._post_job_name(tz_name, hours))
+            await self.post_slot(subs, job.last_nominal if job else None)
+
+    async def prewarm_post_group(self, tz_name, hours):
+        # Fill the response cache and meme pool so the post itself only sends
+        locations = {s.location.key: s.location for s in self._group_subscriptions(tz_name, hours)}
+        await asyncio.gather(
+            self.refill_meme_pool(),
+            *(self.prewarm_location(loc) for loc in locations.values()),
+            return_exceptions=True,
+        )
+
+    async def prewarm_location(self, location):
+        await asyncio.gather(
+            self.get_current_weather(location),
+            self.get_historical_weather(location),
+            self.get_forecast(location),
+            self.get_air_quality(location),
+            return_exceptions=True,
+        )
+
+    def _post_job_name(self, tz_name, hours):
+        return f"post:{tz_name}:{','.join(map(str, hours))}"
+
+    def sync_post_jobs(self):
+        # One cron job per distinct (timezone, hours) schedule; channels sharing a
+        # schedule are posted together
+        wanted = {}
+        for sub in self.registry.all():
+            tz_name, hours = sub.location.timezone, sub.hours
+            if hours:
+                wanted[self._post_job_name(tz_name, hours)] = (tz_name, hours)
+        for name in [n for n in self.scheduler.jobs if n.startswith("post:") and n not in wanted]:
+            self.scheduler.remove(name)
+        for name, (tz_name, hours) in wanted.items():
+            if name in self.scheduler.jobs:
+                continue
+            self.scheduler.add(Job(
+                name,
+                CronSpec(f"0 {','.join(map(str, hours))} * * *", parse_timezone(tz_name)),
+                functools.partial(self.run_post_group, tz_name, hours),
+                prewarm=functools.partial(self.prewarm_post_group, tz_name, hours),
+                prewarm_lead=CONFIG["PREWARM_MINUTES"] * 60,
+                missed=CONFIG["MISSED_RUN_POLICY"],
+                jitter=CONFIG["POST_JITTER"],
+            ))
+
+    def start_scheduler(self):
+        self.seed_auto_channel()
+        self.sync_post_jobs()
+        now = datetime.now(timezone.utc)
+        self.scheduler.add(Job("status", IntervalSpec(CONFIG["STATUS_TICK"]), self.refresh_status), first_run=now)
+        self.scheduler.add(
+            Job("unsplash-index", IntervalSpec(CONFIG["UNSPLASH_REFRESH_INTERVAL"]), self.refresh_image_index, jitter=60),
+            first_run=now,
+        )
+        self.scheduler.add(
+            Job("meme-prefetch", IntervalSpec(CONFIG["PREFETCH_INTERVAL"]), self.refill_meme_pool, jitter=60),
+            first_run=now,
+        )
+        self.bg_task = self.bot.loop.create_task(self.scheduler.run())
+        logging.info(f"Scheduler started with {len(self.scheduler.jobs)} jobs")
+
+    async def geocode(self, query):
+        url = f"https://api.openweathermap.org/geo/1.0/direct?q={urllib.parse.quote(query)}&limit=1&appid={CONFIG['OPENWEATHER_KEY']}"
+        data = await self.fetch_json(url, ttl=CONFIG["CACHE_TTLS"]["history"], endpoint="geocode")
+        if not data:
+            return None
+        place = data[0]
+        return place["name"], round(place["lat"], 4), round(place["lon"], 4)
 
     @commands.Cog.listener()
     async def on_ready(self):
         if not self.scheduler_started:
             self.scheduler_started = True
-            self.bg_task = self.bot.loop.create_task(self.auto_post_loop())
-        if not self.status_started:
-            self.status_started = True
-            self.status_task = self.bot.loop.create_task(self.cycle_status())
+            self.start_scheduler()
 
-    def cog_unload(self):
-        if self.bg_task:
-            self.bg_task.cancel()
-        if self.status_task:
-            self.status_task.cancel()
+    async def cog_unload(self):
+        tasks = [self.bg_task] if self.bg_task else []
+        tasks.extend(self.refill_tasks)
+        tasks.extend(self.reaction_tasks)
+        for task in tasks:
+            task.cancel()
+        tasks.extend(self.scheduler.shutdown())
+        # Let cancelled jobs unwind before the bot closes the stores they use
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.reddit_executor.shutdown(wait=False, cancel_futures=True)
 
     @commands.command(name="briefing")
     async def briefing(self, ctx):
+        with self.briefing_latency.time(trigger="command"):
+            await self._briefing(ctx)
+
+    async def _briefing(self, ctx):
+        sub = self.registry.get(ctx.channel.id)
         async with ctx.typing():
-            meme_file, meme_title = await self.get_reddit_meme()
-            weather_embed = await self.build_weather_embed()
+            (meme_file, meme_title), weather_embed = await asyncio.gather(
+                self.get_reddit_meme(),
+                self.build_weather_embed(sub.location if sub else None),
+            )
             if meme_file:
                 meme_file.fp.seek(0)
                 await ctx.send(content=f"**{meme_title}**", file=meme_file)
@@ -475,10 +1151,161 @@ class Briefing(commands.Cog):
                 await ctx.send("No fresh meme right now 😢")
             await ctx.send(embed=weather_embed)
 
+    @commands.command(name="forecast")
+    async def forecast(self, ctx):
+        sub = self.registry.get(ctx.channel.id)
+        location = sub.location if sub else CONFIG["LOCATION"]
+        model = await self.get_forecast_model(location)
+        if not model or not model.days:
+            await ctx.send(f"Couldn't fetch the forecast for {location.city} 😢")
+            return
+        embed = discord.Embed(title=f"📆 {location.city} • Next {len(model.days)} days", color=0x3498DB)
+        for day in model.days:
+            emoji = self.get_weather_emoji("Clear" if day.weather_id == 800 else WEATHER_MAIN.get(day.weather_id // 100, ""))
+            embed.add_field(
+                name=f"{emoji} {day.day.strftime('%a %d %b')}",
+                value=f"{round(day.temp_min)}°C / {round(day.temp_max)}°C • ☔ {round(day.pop * 100)}% • 🌬️ {round(day.wind_max * 3.6)} km/h",
+                inline=False,
+            )
+        embed.set_footer(text="OpenWeather")
+        await ctx.send(embed=embed)
+
+    def _format_seconds(self, seconds):
+        if seconds is None:
+            return "n/a"
+        return f"{seconds * 1000:.0f} ms" if seconds < 1 else f"{seconds:.1f} s"
+
+    @commands.command(name="stats")
+    @commands.is_owner()
+    async def stats(self, ctx):
+        fmt = self._format_seconds
+        errors = {}
+        for (upstream, endpoint, outcome), n in self.upstream_requests.values.items():
+            if outcome != "ok":
+                errors[(upstream, endpoint)] = errors.get((upstream, endpoint), 0) + n
+        lines = ["**Upstreams** (p50 / p95 • calls • errors)"]
+        for upstream, endpoint in sorted(self.upstream_latency.values):
+            labels = {"upstream": upstream, "endpoint": endpoint}
+            lines.append(
+                f"`{upstream}/{endpoint}` {fmt(self.upstream_latency.quantile(0.5, **labels))} / "
+                f"{fmt(self.upstream_latency.quantile(0.95, **labels))} • {self.upstream_latency.count(**labels)} • "
+                f"{errors.get((upstream, endpoint), 0)}"
+            )
+        if len(lines) == 1:
+            lines.append("No upstream calls yet")
+        lines.append("**Media processing** (p50 / p95)")
+        for (fmt_name,) in sorted(self.media_latency.values):
+            lines.append(
+                f"`{fmt_name}` {fmt(self.media_latency.quantile(0.5, format=fmt_name))} / "
+                f"{fmt(self.media_latency.quantile(0.95, format=fmt_name))} • {self.media_latency.count(format=fmt_name)} images"
+            )
+        lines.append("**Briefings** (p50 / p95)")
+        for trigger in ("command", "scheduled"):
+            lines.append(
+                f"`{trigger}` {fmt(self.briefing_latency.quantile(0.5, trigger=trigger))} / "
+                f"{fmt(self.briefing_latency.quantile(0.95, trigger=trigger))} • {self.briefing_latency.count(trigger=trigger)} runs"
+            )
+        lines.append(
+            f"Channel posts: {self.posts.get(outcome='ok')} ok, {self.posts.get(outcome='error')} failed, "
+            f"{self.posts.get(outcome='missing')} channels missing • "
+            f"slot done p50 {fmt(self.slot_completion.quantile(0.5))} / p95 {fmt(self.slot_completion.quantile(0.95))} after the hour"
+        )
+        lines.append(
+            f"**Caches** response {self.cache.hit_rate:.0%} • media {self.bot.media_cache.hit_rate:.0%} • "
+            f"meme prefetch {self.prefetch_hit_rate:.0%} ({len(self.meme_pool)} ready)"
+        )
+        lag = self.bot.loop_lag.histogram
+        lines.append(
+            f"**Event loop lag** now {fmt(self.bot.loop_lag.gauge.get())} • p99 {fmt(lag.quantile(0.99))} • "
+            f"media queue {self.bot.media_pool.queue_depth}"
+        )
+        await ctx.send("\n".join(lines))
+
     @commands.command(name="test")
     async def test(self, ctx):
         await ctx.message.add_reaction("🧪")
         await self.briefing(ctx)
 
-bot = DailyBriefingBot()
-bot.run(CONFIG["DISCORD_TOKEN"])
\ No newline at end of file
+    @commands.command(name="subscribe")
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def subscribe(self, ctx, *, place: str):
+        # "!subscribe Mumbai" or "!subscribe Mumbai Asia/Kolkata"
+        query, _, tz_name = place.rpartition(" ")
+        if not query or not ("/" in tz_name or tz_name.startswith(("+", "-"))):
+            query, tz_name = place, None
+        found = await self.geocode(query)
+        if not found:
+            await ctx.send(f"Couldn't find **{query}** 🤔")
+            return
+        city, lat, lon = found
+        if not tz_name:
+            tz_name = await self.lookup_timezone(lat, lon)
+        if not tz_name:
+            curr = await self.get_current_weather(Location(city, lat, lon, "UTC"))
+            tz_name = format_offset(curr["timezone"]) if curr and "timezone" in curr else CONFIG["LOCATION"].timezone
+        try:
+            parse_timezone(tz_name)
+        except Exception:
+            await ctx.send(f"Unknown timezone **{tz_name}**")
+            return
+        existing = self.registry.get(ctx.channel.id)
+        hours = existing.hours if existing else self.scheduled_hours
+        self.registry.subscribe(ctx.channel.id, ctx.guild.id, Location(city, lat, lon, tz_name), hours)
+        self.sync_post_jobs()
+        message = f"📍 This channel now gets **{city}** briefings at {', '.join(f'{h}:00' for h in hours)} ({tz_name})"
+        if tz_name[:1] in "+-":
+            message += (
+                f"\n⚠️ {tz_name} is a fixed UTC offset, so posts won't follow daylight saving changes — "
+                f"subscribe with a zone name instead, e.g. `!subscribe {city} Europe/London`"
+            )
+        await ctx.send(message)
+
+    @commands.command(name="schedule")
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def schedule(self, ctx, *hours: int):
+        if not hours or any(not 0 <= h <= 23 for h in hours):
+            await ctx.send("Usage: `!schedule 7 13 18 22` (hours 0-23)")
+            return
+        if not self.registry.set_hours(ctx.channel.id, hours):
+            await ctx.send("This channel isn't subscribed yet — use `!subscribe <city>` first")
+            return
+        self.sync_post_jobs()
+        await ctx.send(f"⏰ Briefings here at {', '.join(f'{h}:00' for h in sorted(set(hours)))}")
+
+    @commands.command(name="unsubscribe")
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def unsubscribe(self, ctx):
+        if self.registry.unsubscribe(ctx.channel.id):
+            self.sync_post_jobs()
+            await ctx.send("🔕 No more auto-posts in this channel")
+        else:
+            await ctx.send("This channel isn't subscribed")
+
+    @commands.command(name="subscriptions")
+    @commands.guild_only()
+    async def subscriptions(self, ctx):
+        subs = self.registry.for_guild(ctx.guild.id)
+        if not subs:
+            await ctx.send("No channels subscribed in this server")
+            return
+        lines = [
+            f"<#{sub.channel_id}> → {sub.location.city} at {', '.join(f'{h}:00' for h in sub.hours)} ({sub.location.timezone})"
+            for sub in subs
+        ]
+        await ctx.send("\n".join(lines))
+
+def main():
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    CONFIG.update(load_config())
+    for key in REQUIRED_KEYS:
+        if not os.getenv(key):
+            raise RuntimeError(f"Missing required environment variable: {key}")
+    bot = DailyBriefingBot()
+    bot.run(CONFIG["DISCORD_TOKEN"])
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
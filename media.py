@@ -0,0 +1,343 @@
+import asyncio
+import logging
+import struct
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+from typing import NamedTuple
+
+# Pillow is imported inside the functions that need it, so importing this module
+# (and main.py) stays cheap; they only run in the media pool
+
+DEFAULT_SETTINGS = {
+    "width": 1200,
+    "height": 675,
+    # Keep every Nth frame of an animation; dropped frames' durations are merged into the kept one
+    "frame_step": 1,
+    "max_frames": 80,
+    # Upper bound for buffered output frames (palette mode, 1 byte per pixel)
+    "memory_cap": 64 * 1024 * 1024,
+    # Discord's upload limit for non-boosted servers, with some headroom
+    "max_bytes": 8 * 1024 * 1024,
+    "static_format": "PNG",
+    "quality": 85,
+}
+
+# (scale, extra frame step) tried in order until the animation fits the byte budget
+ANIMATION_FALLBACKS = [(1.0, 1), (0.75, 1), (0.75, 2), (0.5, 2), (0.5, 3), (0.35, 4)]
+STATIC_QUALITY_STEPS = [0, 15, 30]
+FILENAMES = {"GIF": "meme.gif", "PNG": "meme.png", "JPEG": "meme.jpg", "WEBP": "meme.webp"}
+
+DOWNLOAD_CHUNK = 64 * 1024
+# Give up on finding a recognisable header after this many bytes (JPEG EXIF can be large)
+SNIFF_LIMIT = 256 * 1024
+# JPEG start-of-frame markers; C4, C8 and CC share the range but aren't frames
+JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+class MediaInfo(NamedTuple):
+    format: str
+    width: int
+    height: int
+
+
+class MediaRejected(ValueError):
+    def __init__(self, reason, message):
+        super().__init__(message)
+        # Short label for logs and metrics: too_large, too_many_pixels, too_many_frames, unsupported, empty
+        self.reason = reason
+
+
+def _sniff_jpeg(head):
+    i = 2
+    while i + 4 <= len(head):
+        if head[i] != 0xFF:
+            raise MediaRejected("unsupported", "Corrupt JPEG marker")
+        marker = head[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            i += 2
+            continue
+        if marker in JPEG_SOF:
+            if i + 9 > len(head):
+                return None
+            height, width = struct.unpack(">HH", head[i + 5:i + 9])
+            return MediaInfo("JPEG", width, height)
+        if marker == 0xDA:
+            raise MediaRejected("unsupported", "JPEG without a frame header")
+        i += 2 + struct.unpack(">H", head[i + 2:i + 4])[0]
+    return None
+
+
+def sniff_media(head):
+    # Format and dimensions from the first bytes of a file, without Pillow.
+    # None means more bytes are needed; formats we don't handle raise MediaRejected.
+    if len(head) < 12:
+        return None
+    if head[:8] == b"\x89PNG\r\n\x1a\n":
+        if len(head) < 24:
+            return None
+        width, height = struct.unpack(">II", head[16:24])
+        return MediaInfo("PNG", width, height)
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        width, height = struct.unpack("<HH", head[6:10])
+        return MediaInfo("GIF", width, height)
+    if head[:2] == b"\xff\xd8":
+        return _sniff_jpeg(head)
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        if len(head) < 30:
+            return None
+        chunk = bytes(head[12:16])
+        if chunk == b"VP8X":
+            return MediaInfo("WEBP", 1 + int.from_bytes(head[24:27], "little"), 1 + int.from_bytes(head[27:30], "little"))
+        if chunk == b"VP8L":
+            bits = int.from_bytes(head[21:25], "little")
+            return MediaInfo("WEBP", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+        if chunk == b"VP8 ":
+            width, height = struct.unpack("<HH", head[26:30])
+            return MediaInfo("WEBP", width & 0x3FFF, height & 0x3FFF)
+    raise MediaRejected("unsupported", f"Unrecognised media header {bytes(head[:8])!r}")
+
+
+class GifFrameCounter:
+    # Walks GIF blocks as bytes arrive and counts image descriptors, so an
+    # animation with too many frames is rejected before it finishes downloading
+    def __init__(self, head):
+        packed = head[10]
+        self.pos = 13 + (3 * 2 ** ((packed & 7) + 1) if packed & 0x80 else 0)
+        self.frames = 0
+        self.complete = False
+
+    @staticmethod
+    def _skip_sub_blocks(data, p):
+        while p < len(data):
+            size = data[p]
+            p += 1 + size
+            if size == 0:
+                return p
+        return None
+
+    def scan(self, data):
+        while not self.complete and self.pos < len(data):
+            block = data[self.pos]
+            if block == 0x3B:
+                self.complete = True
+            elif block == 0x21:
+                end = self._skip_sub_blocks(data, self.pos + 2)
+                if end is None:
+                    return
+                self.pos = end
+            elif block == 0x2C:
+                if self.pos + 10 > len(data):
+                    return
+                packed = data[self.pos + 9]
+                table = 3 * 2 ** ((packed & 7) + 1) if packed & 0x80 else 0
+                # Descriptor, local colour table, LZW minimum code size, then image data
+                end = self._skip_sub_blocks(data, self.pos + 10 + table + 1)
+                if end is None:
+                    return
+                self.pos = end
+                self.frames += 1
+            else:
+                raise MediaRejected("unsupported", f"Corrupt GIF block 0x{block:02x}")
+
+
+async def read_media(resp, max_bytes, max_pixels, max_frames):
+    # Streams a response into a single buffer that Pillow later opens directly.
+    # The header is checked as soon as it arrives and the download is abandoned
+    # on anything too big or not an image.
+    if resp.content_length and resp.content_length > max_bytes:
+        raise MediaRejected("too_large", f"Content-Length {resp.content_length} over {max_bytes} bytes")
+    buffer = BytesIO()
+    info = None
+    frames = None
+    async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK):
+        buffer.write(chunk)
+        size = buffer.tell()
+        if size > max_bytes:
+            raise MediaRejected("too_large", f"Body over {max_bytes} bytes")
+        with buffer.getbuffer() as view:
+            if info is None:
+                info = sniff_media(view)
+                if info is None:
+                    if size > SNIFF_LIMIT:
+                        raise MediaRejected("unsupported", f"No image header in the first {SNIFF_LIMIT} bytes")
+                    continue
+                if info.width * info.height > max_pixels:
+                    raise MediaRejected("too_many_pixels", f"{info.format} {info.width}x{info.height} over {max_pixels} pixels")
+                if info.format == "GIF":
+                    frames = GifFrameCounter(view)
+            if frames:
+                frames.scan(view)
+                if frames.frames > max_frames:
+                    raise MediaRejected("too_many_frames", f"GIF over {max_frames} frames")
+    if buffer.tell() == 0:
+        raise MediaRejected("empty", "Empty body")
+    if info is None:
+        raise MediaRejected("unsupported", "Truncated or unrecognised media")
+    buffer.seek(0)
+    return buffer, info
+
+
+def dhash(img, size=8):
+    # 64-bit difference hash of the first frame, used to spot reposts of the same image
+    from PIL import Image
+    small = img.convert("L").resize((size + 1, size), Image.BILINEAR)
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            right = pixels[row * (size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def _letterbox(frame, width, height, content=None):
+    # `content` forces the picture's size inside the canvas; otherwise it is fitted
+    # into the canvas without upscaling
+    from PIL import Image
+    if content:
+        frame = frame.resize(content, Image.LANCZOS)
+    else:
+        frame.thumbnail((width, height), Image.LANCZOS)
+    new_frame = Image.new("RGB", (width, height), (0, 0, 0))
+    paste_pos = ((width - frame.width) // 2, (height - frame.height) // 2)
+    new_frame.paste(frame, paste_pos)
+    return new_frame
+
+
+def _encode_animation(img, n_frames, width, height, content, step):
+    # Frames are quantised as soon as they are decoded, so only palette-mode frames
+    # (1 byte/pixel) are held until the encoder runs, never full RGB copies
+    from PIL import Image
+    frames = []
+    durations = []
+    palette = None
+    for i in range(n_frames):
+        try:
+            img.seek(i)
+        except EOFError:
+            break
+        duration = img.info.get("duration", 100) or 100
+        if i % step:
+            durations[-1] += duration
+            continue
+        frame = _letterbox(img.convert("RGB"), width, height, content)
+        if palette is None:
+            palette = frame.quantize(colors=256, method=Image.Quantize.MEDIANCUT)
+            frames.append(palette)
+        else:
+            frames.append(frame.quantize(palette=palette, dither=Image.Dither.NONE))
+        durations.append(duration)
+    output_buffer = BytesIO()
+    if len(frames) > 1:
+        frames[0].save(
+            output_buffer,
+            format="GIF",
+            append_images=frames[1:],
+            save_all=True,
+            duration=durations,
+            loop=0,
+        )
+    else:
+        frames[0].save(output_buffer, format="GIF")
+    return output_buffer.getvalue()
+
+
+def _encode_static(frame, fmt, quality):
+    output_buffer = BytesIO()
+    if fmt == "PNG":
+        frame.save(output_buffer, format="PNG", optimize=True)
+    elif fmt == "WEBP":
+        frame.save(output_buffer, format="WEBP", quality=quality, method=4)
+    else:
+        frame.save(output_buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return output_buffer.getvalue()
+
+
+# Runs inside the media pool: raw bytes or a file-like buffer in, (encoded bytes,
+# filename, dhash) out. Kept at module level so it can be pickled for a process pool.
+def process_media(data, settings=None):
+    from PIL import Image
+    settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+    width, height = settings["width"], settings["height"]
+    max_bytes = settings["max_bytes"]
+    img = Image.open(data if hasattr(data, "read") else BytesIO(data))
+    is_animated = getattr(img, "is_animated", False)
+    n_frames = getattr(img, "n_frames", 1) if is_animated else 1
+    if is_animated and img.format == "GIF" and n_frames > 1:
+        phash = dhash(img)
+        last = None
+        base_step = settings["frame_step"]
+        for scale, extra_step in ANIMATION_FALLBACKS:
+            w, h = int(width * scale), int(height * scale)
+            # Scale the picture itself, not just the canvas: a source smaller than the
+            # canvas would otherwise keep its size and the step down would save nothing
+            fit = min(1.0, width / img.width, height / img.height) * scale
+            content = (max(1, int(img.width * fit)), max(1, int(img.height * fit)))
+            # The frame cap sets the base step (never finer than the previous attempt's,
+            # even though a smaller canvas would allow more frames); fallbacks thin it further
+            max_frames = max(1, min(settings["max_frames"], settings["memory_cap"] // (w * h)))
+            base_step = max(base_step, -(-n_frames // max_frames))
+            step = base_step * extra_step
+            kept = -(-n_frames // step)
+            # Output size scales roughly with picture area and frame count, so skip
+            # attempts that the previous result already says won't fit
+            predicted = last[0] * (content[0] * content[1] / last[1]) * kept / last[2] if last else 0
+            if predicted > max_bytes and (scale, extra_step) != ANIMATION_FALLBACKS[-1]:
+                continue
+            output = _encode_animation(img, n_frames, w, h, content, step)
+            if len(output) <= max_bytes:
+                return output, FILENAMES["GIF"], phash
+            logging.info(f"Animated output {len(output)} bytes over budget at {w}x{h} ({kept} frames), stepping down")
+            last = (len(output), content[0] * content[1], kept)
+        raise ValueError(f"Animation does not fit in {max_bytes} bytes")
+    # Let the JPEG decoder downscale while decoding instead of materialising the full image
+    img.draft("RGB", (width, height))
+    phash = dhash(img)
+    frame = _letterbox(img.convert("RGB"), width, height)
+    fmt = settings["static_format"].upper()
+    output = _encode_static(frame, fmt, settings["quality"])
+    if len(output) <= max_bytes:
+        return output, FILENAMES[fmt], phash
+    # Lossless PNG is often multi-MB for photos; fall back to lossy steps
+    if fmt == "PNG":
+        fmt = "JPEG"
+    for drop in STATIC_QUALITY_STEPS:
+        output = _encode_static(frame, fmt, settings["quality"] - drop)
+        if len(output) <= max_bytes:
+            return output, FILENAMES[fmt], phash
+    raise ValueError(f"Image does not fit in {max_bytes} bytes")
+
+
+class MediaPool:
+    def __init__(self, workers=2, kind="thread"):
+        self.workers = workers
+        self.kind = kind
+        if kind == "process":
+            self.executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            # Pillow releases the GIL while resampling/encoding, so threads parallelise well too
+            self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="media")
+        self.pending = 0
+        self.completed = 0
+
+    @property
+    def queue_depth(self):
+        # Jobs submitted but not finished, including the ones currently running
+        return self.pending
+
+    async def run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        try:
+            return await loop.run_in_executor(self.executor, fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def shutdown(self):
+        logging.info(f"Shutting down media pool ({self.queue_depth} jobs pending)")
+        self.executor.shutdown(wait=False, cancel_futures=True)
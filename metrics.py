@@ -0,0 +1,224 @@
+import asyncio
+import bisect
+import logging
+import time
+from contextlib import contextmanager
+from aiohttp import web
+
+# Upper bounds in seconds; covers cache hits (sub-ms) up to retried upstream calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value):
+    # Counters stay exact; %g would round anything past six digits
+    return str(value) if isinstance(value, int) else f"{value:g}"
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels=(), fn=None):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.values = {}
+        # fn() is read at scrape time and returns a number, or {label tuple: number};
+        # for values some other object already keeps (cache hit counts and the like)
+        self.fn = fn
+
+    def _key(self, labels):
+        return tuple(labels.get(name, "") for name in self.label_names)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def current(self):
+        if not self.fn:
+            return self.values
+        try:
+            result = self.fn()
+        except Exception as e:
+            logging.warning(f"Metric {self.name} failed: {e}")
+            return None
+        return result if isinstance(result, dict) else {(): result}
+
+    def render(self):
+        lines = self.header()
+        for key, value in sorted((self.current() or {}).items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self.values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        self.values[self._key(labels)] = value
+
+    def get(self, **labels):
+        return self.values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        series = self.values.get(key)
+        if series is None:
+            # Per-bucket (non-cumulative) counts, then sum and count
+            series = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        series = self.values.get(self._key(labels))
+        return series[2] if series else 0
+
+    def quantile(self, q, **labels):
+        # Linear interpolation inside the bucket, as Prometheus' histogram_quantile does
+        series = self.values.get(self._key(labels))
+        if not series or not series[2]:
+            return None
+        rank = q * series[2]
+        seen = 0
+        for i, n in enumerate(series[0]):
+            if seen + n >= rank and n:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                low = self.buckets[i - 1] if i else 0.0
+                return low + (self.buckets[i] - low) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+    def render(self):
+        lines = self.header()
+        for key, (counts, total, n) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, c in zip((*self.buckets, "+Inf"), counts):
+                cumulative += c
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {total:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {n}")
+        return lines
+
+
+# Plain in-process registry: recording is a dict lookup and an increment, and the
+# text exposition is only built when something scrapes it
+class Metrics:
+    def __init__(self):
+        self.metrics = {}
+
+    def _register(self, metric):
+        # Re-registering (e.g. a reloaded cog) hands back the existing series
+        existing = self.metrics.get(metric.name)
+        if existing is not None:
+            if existing.kind != metric.kind:
+                raise ValueError(f"Metric {metric.name} already registered as a {existing.kind}")
+            if metric.fn:
+                existing.fn = metric.fn
+            return existing
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labels=(), fn=None):
+        return self._register(Counter(name, help_text, labels, fn))
+
+    def gauge(self, name, help_text, labels=(), fn=None):
+        return self._register(Gauge(name, help_text, labels, fn))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class LoopLagMonitor:
+    # Sleeps for `interval` and records how much later than that it woke up
+    def __init__(self, histogram, gauge, interval=0.5):
+        self.histogram = histogram
+        self.gauge = gauge
+        self.interval = interval
+        self.task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            self.histogram.observe(lag)
+            self.gauge.set(lag)
+
+    def start(self):
+        self.task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+
+
+class MetricsServer:
+    # Prometheus text endpoint; binds to localhost by default
+    def __init__(self, metrics, host="127.0.0.1", port=9108):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.runner = None
+
+    async def _handle(self, request):
+        return web.Response(
+            body=self.metrics.render().encode(),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        logging.info(f"Metrics on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
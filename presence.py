@@ -0,0 +1,56 @@
+import asyncio
+import logging
+import time
+
+
+# Sends the bot's status text only when it changes, and at most once per
+# min_interval; changes inside the window collapse into one update carrying the
+# latest text. Keeps well under the gateway's presence-update rate limit.
+class PresenceUpdater:
+    def __init__(self, send, min_interval=60):
+        self.send = send
+        self.min_interval = min_interval
+        self.current = None
+        self.pending = None
+        self.last_sent = float("-inf")
+        self.sent = 0
+        self.unchanged = 0
+        self._task = None
+
+    def update(self, text):
+        if text == self.pending or (self.pending is None and text == self.current):
+            self.unchanged += 1
+            return
+        self.pending = text
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush())
+
+    async def _flush(self):
+        # Text that arrives while a send is in flight is picked up by the next pass
+        while self.pending is not None:
+            wait = self.last_sent + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            text, self.pending = self.pending, None
+            if text == self.current:
+                continue
+            try:
+                await self.send(text)
+            except Exception as e:
+                logging.warning(f"Presence update failed: {e}")
+                continue
+            self.current = text
+            self.last_sent = time.monotonic()
+            self.sent += 1
+
+    def invalidate(self):
+        # The gateway drops our presence on reconnect; send the last text again
+        text = self.pending or self.current
+        self.current = None
+        if text:
+            self.pending = None
+            self.update(text)
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
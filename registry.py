@@ -0,0 +1,132 @@
+import sqlite3
+from datetime import timedelta, timezone
+from typing import NamedTuple
+from zoneinfo import ZoneInfo
+
+DEFAULT_HOURS = (7, 13, 18, 22)
+
+
+def parse_timezone(name):
+    # IANA names ("Asia/Kolkata") or fixed UTC offsets ("+05:30") from OpenWeather
+    if name[:1] in "+-":
+        sign = -1 if name[0] == "-" else 1
+        hours, _, minutes = name[1:].partition(":")
+        return timezone(sign * timedelta(hours=int(hours), minutes=int(minutes or 0)))
+    return ZoneInfo(name)
+
+
+def format_offset(seconds):
+    sign = "-" if seconds < 0 else "+"
+    seconds = abs(seconds)
+    return f"{sign}{seconds // 3600:02d}:{seconds % 3600 // 60:02d}"
+
+
+class Location(NamedTuple):
+    city: str
+    lat: float
+    lon: float
+    timezone: str
+
+    @property
+    def key(self):
+        # Channels subscribed to the same place share one set of upstream fetches
+        return f"{self.lat:.4f},{self.lon:.4f}"
+
+    @property
+    def tz(self):
+        return parse_timezone(self.timezone)
+
+
+class Subscription(NamedTuple):
+    channel_id: int
+    guild_id: int
+    location: Location
+    hours: tuple
+
+
+class SubscriptionRegistry:
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS subscriptions (
+                channel_id INTEGER PRIMARY KEY,
+                guild_id INTEGER,
+                city TEXT NOT NULL,
+                lat REAL NOT NULL,
+                lon REAL NOT NULL,
+                timezone TEXT NOT NULL,
+                hours TEXT NOT NULL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_subscriptions_guild ON subscriptions (guild_id)")
+        # One-off markers, e.g. which AUTO_CHANNEL_ID has already been seeded
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.commit()
+        self._cache = None
+
+    @staticmethod
+    def _row_to_subscription(row):
+        channel_id, guild_id, city, lat, lon, tz, hours = row
+        return Subscription(
+            channel_id,
+            guild_id,
+            Location(city, lat, lon, tz),
+            tuple(int(h) for h in hours.split(",") if h),
+        )
+
+    def subscribe(self, channel_id, guild_id, location, hours=DEFAULT_HOURS):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO subscriptions VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                channel_id,
+                guild_id,
+                location.city,
+                location.lat,
+                location.lon,
+                location.timezone,
+                ",".join(str(h) for h in sorted(set(hours))),
+            ),
+        )
+        self.conn.commit()
+        self._cache = None
+
+    def set_hours(self, channel_id, hours):
+        cur = self.conn.execute(
+            "UPDATE subscriptions SET hours = ? WHERE channel_id = ?",
+            (",".join(str(h) for h in sorted(set(hours))), channel_id),
+        )
+        self.conn.commit()
+        self._cache = None
+        return cur.rowcount > 0
+
+    def unsubscribe(self, channel_id):
+        cur = self.conn.execute("DELETE FROM subscriptions WHERE channel_id = ?", (channel_id,))
+        self.conn.commit()
+        self._cache = None
+        return cur.rowcount > 0
+
+    def all(self):
+        # Read on every scheduler tick, so keep a snapshot until the next write
+        if self._cache is None:
+            rows = self.conn.execute("SELECT * FROM subscriptions ORDER BY channel_id").fetchall()
+            self._cache = [self._row_to_subscription(row) for row in rows]
+        return self._cache
+
+    def get(self, channel_id):
+        return next((s for s in self.all() if s.channel_id == channel_id), None)
+
+    def for_guild(self, guild_id):
+        return [s for s in self.all() if s.guild_id == guild_id]
+
+    def get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, str(value)))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,223 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from datetime import datetime, time as dtime, timedelta, timezone
+
+# Longest single sleep; the loop re-reads the wall clock at least this often so
+# clock adjustments and timezone rule changes are noticed
+MAX_SLEEP = 30
+# Weekday accepts both 0 and 7 for Sunday
+CRON_FIELDS = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+
+def _parse_cron_field(field, low, high):
+    values = set()
+    for part in field.split(","):
+        expr, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if expr == "*":
+            start, end = low, high
+        elif "-" in expr:
+            start, end = (int(x) for x in expr.split("-"))
+        else:
+            start = int(expr)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron field out of range: {part}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSpec:
+    # Standard 5-field cron ("minute hour day month weekday"), evaluated in a timezone
+    def __init__(self, expr, tz):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Expected 5 cron fields, got {expr!r}")
+        parsed = [_parse_cron_field(f, low, high) for f, (low, high) in zip(fields, CRON_FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = (sorted(p) for p in parsed)
+        self.weekdays = {d % 7 for d in weekdays}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+        self.expr = expr
+        self.tz = tz
+
+    def _day_matches(self, day):
+        if day.month not in self.months:
+            return False
+        dom = day.day in self.days
+        dow = (day.weekday() + 1) % 7 in self.weekdays
+        # Cron semantics: if both day fields are restricted, either may match
+        if self.any_day:
+            return dow
+        if self.any_weekday:
+            return dom
+        return dom or dow
+
+    def next_after(self, dt):
+        local = dt.astimezone(self.tz)
+        for offset in range(367):
+            day = local.date() + timedelta(days=offset)
+            if not self._day_matches(day):
+                continue
+            for hour in self.hours:
+                for minute in self.minutes:
+                    candidate = datetime.combine(day, dtime(hour, minute), tzinfo=self.tz)
+                    if candidate > dt:
+                        return candidate
+        raise ValueError(f"Cron spec {self.expr!r} never fires")
+
+    def __repr__(self):
+        return f"CronSpec({self.expr!r}, {self.tz})"
+
+
+class IntervalSpec:
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def next_after(self, dt):
+        return dt + timedelta(seconds=self.seconds)
+
+    def __repr__(self):
+        return f"IntervalSpec({self.seconds})"
+
+
+class Job:
+    def __init__(
+        self,
+        name,
+        spec,
+        callback,
+        prewarm=None,
+        prewarm_lead=0,
+        missed="catch_up",
+        grace=300,
+        jitter=0,
+    ):
+        self.name = name
+        self.spec = spec
+        self.callback = callback
+        self.prewarm = prewarm
+        self.prewarm_lead = prewarm_lead
+        # "catch_up" runs once as soon as possible after a missed slot, "skip" waits for the next one
+        self.missed = missed
+        self.grace = grace
+        self.jitter = jitter
+        self.next_run = None
+        self.generation = 0
+        self.running = 0
+        self.runs = 0
+        self.skipped = 0
+        self.last_nominal = None
+        self.last_lateness = 0.0
+        self.max_lateness = 0.0
+
+
+class Scheduler:
+    def __init__(self):
+        self.jobs = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._tasks = set()
+        self._last_tick = None
+
+    def add(self, job, first_run=None):
+        self.remove(job.name)
+        self.jobs[job.name] = job
+        now = datetime.now(timezone.utc)
+        self._schedule(job, first_run or job.spec.next_after(now), now)
+        return job
+
+    def remove(self, name):
+        job = self.jobs.pop(name, None)
+        if job:
+            # Heap entries are dropped lazily when their generation no longer matches
+            job.generation += 1
+            self._wakeup.set()
+        return job
+
+    def _schedule(self, job, nominal, now):
+        job.generation += 1
+        job.next_run = nominal
+        offset = random.uniform(0, job.jitter) if job.jitter else 0
+        run_at = nominal.timestamp() + offset
+        heapq.heappush(self._heap, (run_at, next(self._seq), "run", job, job.generation, nominal))
+        if job.prewarm and job.prewarm_lead:
+            warm_at = run_at - job.prewarm_lead
+            if warm_at > now.timestamp():
+                heapq.heappush(self._heap, (warm_at, next(self._seq), "prewarm", job, job.generation, nominal))
+        self._wakeup.set()
+
+    def _reschedule_all(self):
+        now = datetime.now(timezone.utc)
+        self._heap.clear()
+        for job in self.jobs.values():
+            self._schedule(job, job.spec.next_after(now), now)
+
+    def _spawn(self, coro, job, label):
+        async def runner():
+            job.running += 1
+            try:
+                await coro
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Scheduled {label} '{job.name}' failed: {e}")
+            finally:
+                job.running -= 1
+
+        task = asyncio.create_task(runner())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def run(self):
+        while True:
+            now_ts = time.time()
+            # A backwards clock step would leave every entry too far in the future
+            if self._last_tick and now_ts < self._last_tick - MAX_SLEEP:
+                logging.warning("Wall clock moved backwards, rebuilding schedule")
+                self._reschedule_all()
+            self._last_tick = now_ts
+            if self._heap and self._heap[0][4] != self._heap[0][3].generation:
+                heapq.heappop(self._heap)
+                continue
+            delay = self._heap[0][0] - now_ts if self._heap else MAX_SLEEP
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), min(delay, MAX_SLEEP))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            run_at, _, kind, job, _, nominal = heapq.heappop(self._heap)
+            if kind == "prewarm":
+                self._spawn(job.prewarm(), job, "prewarm")
+                continue
+            lateness = now_ts - run_at
+            now = datetime.now(timezone.utc)
+            self._schedule(job, job.spec.next_after(max(nominal, now)), now)
+            if lateness > job.grace and job.missed == "skip":
+                job.skipped += 1
+                logging.warning(f"Skipping '{job.name}' slot {nominal.isoformat()} ({lateness:.0f}s late)")
+                continue
+            job.runs += 1
+            job.last_nominal = nominal
+            job.last_lateness = lateness
+            job.max_lateness = max(job.max_lateness, lateness)
+            if lateness > 1:
+                logging.info(f"Job '{job.name}' started {lateness:.1f}s late")
+            self._spawn(job.callback(), job, "job")
+
+    def lateness(self):
+        return {name: job.last_lateness for name, job in self.jobs.items()}
+
+    def shutdown(self):
+        # Cancels running jobs and returns their tasks so the caller can wait for them
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        return tasks
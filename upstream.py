@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import random
+import time
+import urllib.parse
+from contextlib import asynccontextmanager
+import aiohttp
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Breakers are shared per provider rather than per URL, so one bad endpoint
+# trips fast failure for the whole API
+PROVIDERS = {
+    "api.openweathermap.org": "openweather",
+    "weather.visualcrossing.com": "visualcrossing",
+    "api.unsplash.com": "unsplash",
+}
+
+
+class UpstreamError(Exception):
+    pass
+
+
+class CircuitOpenError(UpstreamError):
+    pass
+
+
+def provider_for(url):
+    host = urllib.parse.urlsplit(url).hostname or ""
+    return PROVIDERS.get(host, host)
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=5, reset_timeout=60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+    def allow(self):
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+            # Let a single probe through; its result decides whether to close again
+            self.state = "half_open"
+            self.probing = False
+        if self.state == "half_open" and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self):
+        if self.state != "closed":
+            logging.info(f"Circuit for {self.name} closed")
+        self.state = "closed"
+        self.failures = 0
+        self.probing = False
+
+    def release(self):
+        # A cancelled probe says nothing about the upstream; let the next call probe instead
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.probing = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logging.warning(f"Circuit for {self.name} opened after {self.failures} failures")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+class UpstreamClient:
+    def __init__(
+        self,
+        concurrency=8,
+        limit_per_host=4,
+        connect_timeout=5,
+        read_timeout=10,
+        retries=2,
+        backoff=0.5,
+        max_backoff=8,
+        max_retry_after=10,
+        failure_threshold=5,
+        reset_timeout=60,
+    ):
+        self.limit_per_host = limit_per_host
+        self.timeout = aiohttp.ClientTimeout(total=None, sock_connect=connect_timeout, sock_read=read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.limit = asyncio.Semaphore(concurrency)
+        self.breakers = {}
+        self.session = None
+
+    async def start(self):
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=300,
+            keepalive_timeout=60,
+        )
+        self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+
+    async def close(self):
+        if self.session and not self.session.closed:
+            await self.session.close()
+
+    def breaker(self, provider):
+        if provider not in self.breakers:
+            self.breakers[provider] = CircuitBreaker(provider, self.failure_threshold, self.reset_timeout)
+        return self.breakers[provider]
+
+    def _retry_delay(self, attempt, resp=None):
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        # Exponential backoff with full jitter
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    @asynccontextmanager
+    async def request(self, url, headers=None, provider=None):
+        provider = provider or provider_for(url)
+        breaker = self.breaker(provider)
+        for attempt in range(self.retries + 1):
+            if not breaker.allow():
+                raise CircuitOpenError(f"Circuit open for {provider}")
+            last_try = attempt == self.retries
+            async with self.limit:
+                try:
+                    resp = await self.session.get(url, headers=headers or {})
+                except asyncio.CancelledError:
+                    breaker.release()
+                    raise
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    breaker.record_failure()
+                    if last_try:
+                        raise UpstreamError(f"{provider} request failed: {e!r}") from e
+                    delay = self._retry_delay(attempt)
+                else:
+                    if resp.status not in RETRY_STATUSES:
+                        breaker.record_success()
+                        try:
+                            yield resp
+                        finally:
+                            resp.release()
+                        return
+                    breaker.record_failure()
+                    delay = self._retry_delay(attempt, resp)
+                    resp.release()
+                    if last_try or delay > self.max_retry_after:
+                        raise UpstreamError(f"{provider} returned {resp.status}")
+            if breaker.state == "open":
+                raise CircuitOpenError(f"Circuit opened for {provider}, not retrying")
+            logging.info(f"Retrying {provider} in {delay:.1f}s (attempt {attempt + 2}/{self.retries + 1})")
+            await asyncio.sleep(delay)